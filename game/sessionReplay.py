@@ -0,0 +1,269 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+# Record pygame sessions of the client in main.py and replay them headless with the SDL dummy
+# video driver, timing every frame and counting the surfaces and blits it costs.
+#
+# A session file is JSON lines: a header with the deal, then one line per frame holding the
+# input events of that frame and the client state after it.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_client(headless=True):
+    # main.py sets up the display at import time, so the driver must be chosen first.
+    if headless:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.chdir(REPO_ROOT)  # Card images are loaded from paths relative to the repository
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return importlib.import_module('main')
+
+
+def client_state(client):
+    return {
+        'selected_card_index': client.selected_card_index,
+        'hand_sizes': [len(hand) for hand in client.player_hands],
+    }
+
+
+def encode_event(event):
+    attributes = {}
+    for name, value in event.dict.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        if isinstance(value, (int, float, str, bool, list)) or value is None:
+            attributes[name] = value
+    return {'type': event.type, 'attributes': attributes}
+
+
+def decode_event(pygame, data):
+    attributes = {name: tuple(value) if isinstance(value, list) else value
+                  for name, value in data['attributes'].items()}
+    return pygame.event.Event(data['type'], attributes)
+
+
+def deal_header(client):
+    return {'window': list(client.WINDOW_SIZE),
+            'hands': [[[card.suit, card.rank] for card in hand] for hand in client.player_hands]}
+
+
+def restore_deal(client, header):
+    #Give the client the recorded hands so the replay draws exactly the recorded cards.
+    by_name = {(card.suit, card.rank): card for card in client.deck.cards}
+    client.player_hands = [[by_name[tuple(card)] for card in hand] for hand in header['hands']]
+    client.selected_card_index = None
+
+
+class SessionRecorder:
+    def __init__(self, path, client):
+        """Write the client's deal and then every frame's events and state to path."""
+        self.client = client
+        self.frame = 0
+        self.file = open(path, 'w')
+        self.file.write(json.dumps(deal_header(client)) + '\n')
+
+    def capture(self, events):
+        line = {'frame': self.frame, 'events': [encode_event(event) for event in events],
+                'state': client_state(self.client)}
+        self.file.write(json.dumps(line) + '\n')
+        self.frame += 1
+
+    def close(self):
+        self.file.close()
+
+
+def load_session(path):
+    with open(path) as session_file:
+        header = json.loads(session_file.readline())
+        frames = [json.loads(line) for line in session_file if line.strip()]
+    return header, frames
+
+
+def script_session(path, frames=600, click_every=15, seed=0):
+    """Write a scripted session that clicks cards of the human hand at a steady pace.
+
+    The client runs over the scripted events as they are written, so every frame carries
+    the state a faithful replay must reproduce.
+    """
+    client = load_client()
+    from common.constants import SUITS, RANKS  # Importable once load_client has set up sys.path
+    pygame = client.pygame
+    rng = random.Random(seed)
+    names = [(suit, rank) for suit in SUITS for rank in RANKS]
+    rng.shuffle(names)
+    header = {'window': list(client.WINDOW_SIZE), 'hands': [names[i * 10:(i + 1) * 10] for i in range(3)]}
+    restore_deal(client, header)
+    hand_size = len(header['hands'][2])
+    with open(path, 'w') as session_file:
+        session_file.write(json.dumps(header) + '\n')
+        for frame in range(frames):
+            events = []
+            if frame % click_every == click_every - 1:
+                j = rng.randrange(hand_size)
+                left = client.PLAYER1_POSITION[0] + j * 35 - (hand_size * 35 // 2)
+                top = client.PLAYER1_POSITION[1] - client.CARD_SIZE[1]
+                # handle_card_click takes the first card in hand order whose full 110 px rect holds
+                # the point, and the rects of the cards before j end 75 px into card j.
+                event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, {'pos': (left + 80, top + 20), 'button': 1})
+                events.append(encode_event(event))
+            client.handle_events([decode_event(pygame, event) for event in events])
+            session_file.write(json.dumps({'frame': frame, 'events': events, 'state': client_state(client)}) + '\n')
+
+
+class FrameCounters:
+    def __init__(self):
+        self.surfaces = 0
+        self.blits = 0
+
+
+class _CountingScreen:
+    # Stands in for the display surface and counts blits.
+    def __init__(self, surface, counters):
+        self._surface = surface
+        self._counters = counters
+
+    def blit(self, *args, **kwargs):
+        self._counters.blits += 1
+        return self._surface.blit(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._surface, name)
+
+
+class _CountingFont:
+    # Stands in for a pygame font and counts the surfaces render() allocates.
+    def __init__(self, font, counters):
+        self._font = font
+        self._counters = counters
+
+    def render(self, *args, **kwargs):
+        self._counters.surfaces += 1
+        return self._font.render(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._font, name)
+
+
+@contextmanager
+def instrument(client):
+    #Count blits to the screen and surfaces made by font rendering and scaling while active.
+    pygame = client.pygame
+    counters = FrameCounters()
+    screen, font, scale = client.screen, client.font, pygame.transform.scale
+
+    def counting_scale(*args, **kwargs):
+        counters.surfaces += 1
+        return scale(*args, **kwargs)
+
+    client.screen = _CountingScreen(screen, counters)
+    client.font = _CountingFont(font, counters)
+    pygame.transform.scale = counting_scale
+    try:
+        yield counters
+    finally:
+        client.screen, client.font, pygame.transform.scale = screen, font, scale
+
+
+def replay(path, repeat=1):
+    """Replay a session headless and return the frame statistics."""
+    header, frames = load_session(path)
+    client = load_client()
+    pygame = client.pygame
+    frame_times, surfaces, blits = [], [], []
+    divergences = 0
+    with instrument(client) as counters:
+        for _ in range(repeat):
+            restore_deal(client, header)
+            for frame in frames:
+                events = [decode_event(pygame, event) for event in frame['events']]
+                counters.surfaces = counters.blits = 0
+                started = time.perf_counter()
+                client.handle_events(events)
+                client.draw_frame()
+                pygame.display.flip()
+                frame_times.append(time.perf_counter() - started)
+                surfaces.append(counters.surfaces)
+                blits.append(counters.blits)
+                if frame['state'] is not None and frame['state'] != client_state(client):
+                    divergences += 1
+    return summarize(frame_times, surfaces, blits, divergences)
+
+
+def summarize(frame_times, surfaces, blits, divergences):
+    quantiles = statistics.quantiles(frame_times, n=100) if len(frame_times) > 1 else frame_times * 99
+    return {
+        'frames': len(frame_times),
+        'frame_ms': {
+            'mean': statistics.fmean(frame_times) * 1000,
+            'p50': quantiles[49] * 1000,
+            'p90': quantiles[89] * 1000,
+            'p99': quantiles[98] * 1000,
+            'max': max(frame_times) * 1000,
+        },
+        'surfaces_per_frame': {'mean': statistics.fmean(surfaces), 'max': max(surfaces)},
+        'blits_per_frame': {'mean': statistics.fmean(blits), 'max': max(blits)},
+        'divergent_frames': divergences,
+    }
+
+
+def print_report(report):
+    frame_ms = report['frame_ms']
+    print(f"Frames: {report['frames']}  divergent: {report['divergent_frames']}")
+    print(f"Frame time (ms): mean {frame_ms['mean']:.2f}  p50 {frame_ms['p50']:.2f}  p90 {frame_ms['p90']:.2f}  "
+          f"p99 {frame_ms['p99']:.2f}  max {frame_ms['max']:.2f}")
+    print(f"Surfaces per frame: mean {report['surfaces_per_frame']['mean']:.1f}  "
+          f"max {report['surfaces_per_frame']['max']}")
+    print(f"Blits per frame: mean {report['blits_per_frame']['mean']:.1f}  max {report['blits_per_frame']['max']}")
+
+
+def record(path):
+    client = load_client(headless=False)
+    recorder = SessionRecorder(path, client)
+    try:
+        client.main(recorder)
+    finally:
+        recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, script and replay client sessions for benchmarking.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="Play in a window and record the session.")
+    record_parser.add_argument('path')
+    script_parser = commands.add_parser('script', help="Write a scripted session of card clicks.")
+    script_parser.add_argument('path')
+    script_parser.add_argument('--frames', type=int, default=600)
+    script_parser.add_argument('--click-every', type=int, default=15)
+    script_parser.add_argument('--seed', type=int, default=0)
+    replay_parser = commands.add_parser('replay', help="Replay a session headless and report frame statistics.")
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--repeat', type=int, default=1)
+    replay_parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+    args = parser.parse_args()
+    path = os.path.abspath(args.path)  # The client changes into the repository directory
+
+    if args.command == 'record':
+        record(path)
+    elif args.command == 'script':
+        script_session(path, args.frames, args.click_every, args.seed)
+    else:
+        report = replay(path, args.repeat)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+        # Non-zero exit when the replay did not reproduce the recorded session.
+        sys.exit(1 if report['divergent_frames'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import threading
+import time
+from copy import deepcopy
+
+from game.skat.mcts import MCTS, Node
+
+
+class AIWorker:
+    def __init__(self, mcts=None, time_budget=2.0, progress_every=50):
+        """Run MCTS on a background thread so a render loop keeps drawing while the AI thinks.
+
+        The tree is kept between searches: work done while pondering on the human's turn
+        is reused once the human's move is known. The pygame client has no card play yet,
+        so nothing in it drives the worker; it is meant for the game logic once it has.
+        """
+        self.mcts = mcts or MCTS()
+        self.time_budget = time_budget
+        self.progress_every = progress_every
+        self.root = None
+        self.thread = None
+        self.cancel_event = threading.Event()
+        self.result = None
+        self.pondering = False
+        self.started_at = None
+        self.best_move = None
+
+    @property
+    def is_thinking(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def progress(self):
+        #Return (iterations in the current tree, seconds spent on this search, best move so far).
+        if self.root is None:
+            return 0, 0.0, None
+        elapsed = time.perf_counter() - self.started_at if self.is_thinking else 0.0
+        return self.root.visits, elapsed, self.best_move
+
+    def start_search(self, state, time_budget=None):
+        """Search for the AI's move; poll() returns it once the time budget is spent.
+
+        Raises ValueError when the player to move has no card left to play.
+        """
+        if state.is_terminal() or not state.get_legal_moves():
+            raise ValueError("There is no move to search for in a finished position.")
+        budget = self.time_budget if time_budget is None else time_budget
+        self.pondering = False
+        self._start(state, time.perf_counter() + budget)
+
+    def ponder(self, state):
+        """Search the position while the human is to move, until cancelled or a move is reported."""
+        self.pondering = True
+        self._start(state, None)
+
+    def notify_move(self, move):
+        """Re-root the tree on a move played at the table, keeping the statistics below it."""
+        self.cancel()
+        if self.root is not None:
+            self.root = self._child_for(self.root, move)
+
+    def poll(self):
+        """Return the chosen move once a search has finished, None otherwise."""
+        if self.result is None or self.is_thinking:
+            return None
+        move, self.result = self.result, None
+        self.notify_move(move)
+        return move
+
+    def cancel(self):
+        #Stop the current search; the tree built so far is kept.
+        self.cancel_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _start(self, state, deadline):
+        self.cancel()
+        self.result = None
+        if self.root is None or not self._same_position(self.root.state, state):
+            self.root = Node(deepcopy(state))
+        self.best_move = None
+        # Rollout weights are cached per simulated state; start each search with a fresh cache.
+        self.mcts.state_cache.clear()
+        self.cancel_event = threading.Event()
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._search, args=(self.root, self.cancel_event, deadline),
+                                       daemon=True)
+        self.thread.start()
+
+    def _search(self, root, cancel_event, deadline):
+        def should_stop():
+            return cancel_event.is_set() or deadline is not None and time.perf_counter() >= deadline
+
+        def on_progress(iteration, node):
+            if not cancel_event.is_set() and node.children:
+                self.best_move = node.best_child(0).state.last_move
+
+        self.mcts.search(root, should_stop=should_stop, on_progress=on_progress, progress_every=self.progress_every)
+        if deadline is not None and not cancel_event.is_set():
+            # A budget too short for a single expansion still answers with the heuristic's pick.
+            self.result = root.best_child(0).state.last_move if root.children else root.untried_actions[-1]
+
+    @staticmethod
+    def _child_for(node, move):
+        for child in node.children:
+            if child.state.last_move == move:
+                child.parent = None
+                return child
+        next_state = deepcopy(node.state)
+        next_state.perform_move(move)
+        return Node(next_state)
+
+    @staticmethod
+    def _same_position(state, other):
+        return (state.current_player == other.current_player and
+                state.trick_cards == other.trick_cards and
+                state.cards_in_hand == other.cards_in_hand)
@@ -0,0 +1,107 @@
+import numpy as np
+
+from game.skat import compactCards as cc
+
+# Random rollouts for many independent games at once. Every game in a batch must be at
+# the same point of play (same number of cards left and of cards in the current trick),
+# so all of them advance one card per step in lockstep.
+
+EFFECTIVE_SUIT = np.array(cc.EFFECTIVE_SUIT, dtype=np.int8)  # (game type, card)
+POWER = np.array(cc.POWER, dtype=np.int16)  # (game type, card)
+FOLLOW = np.array([[[(mask >> card) & 1 for card in range(cc.NUM_CARDS)] for mask in masks]
+                   for masks in cc.FOLLOW_MASKS], dtype=bool)  # (game type, effective suit, card)
+CARD_POINTS = np.array(cc.CARD_POINTS, dtype=np.int16)
+_BITS = np.arange(cc.NUM_CARDS, dtype=np.uint64)
+
+
+def masks_to_matrix(masks):
+    """Turn an array of card masks of any shape into booleans with a trailing axis of 32 cards."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    return ((masks[..., None] >> _BITS) & 1).astype(bool)
+
+
+def matrix_to_masks(matrix):
+    """Inverse of masks_to_matrix."""
+    return (np.asarray(matrix, dtype=np.uint64) << _BITS).sum(axis=-1)
+
+
+def legal_moves(game_index, hands, lead_cards):
+    """Return the (N, 32) mask of legal cards; lead_cards is None when the hands lead."""
+    if lead_cards is None:
+        return hands
+    lead_suit = EFFECTIVE_SUIT[game_index, lead_cards]
+    follow = hands & FOLLOW[game_index, lead_suit]
+    return np.where(follow.any(axis=1)[:, None], follow, hands)
+
+
+def trick_winners(game_index, tricks):
+    """Return the offset from the leader of the winning card for (N, 3) tricks."""
+    suits = EFFECTIVE_SUIT[game_index[:, None], tricks]
+    power = POWER[game_index[:, None], tricks].astype(np.int32)
+    # Trumps beat everything, cards of the led suit compete by power, the rest cannot win.
+    strength = np.where(suits == cc.TRUMP, power + 1000, np.where(suits == suits[:, :1], power, -1))
+    return strength.argmax(axis=1)
+
+
+def run(game_index, hands, leader, declarer, trick=None, points=None, tricks_won=None, rng=None):
+    """Play N games to the end with uniformly random legal cards and return their rewards.
+
+    game_index, leader and declarer have shape (N,) (or are scalars), hands is (N, 3, 32) bool
+    and is not modified, trick is (N, k) with the k cards already played to the current trick,
+    and points / tricks_won are the declarer's card points and tricks so far. The reward is
+    1 when the declarer wins and -1 otherwise, as in SkatGameState.get_reward.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    hands = np.array(hands, dtype=bool, copy=True)
+    count = hands.shape[0]
+    rows = np.arange(count)
+    game_index = np.broadcast_to(np.asarray(game_index, dtype=np.int64), (count,))
+    leader = np.broadcast_to(np.asarray(leader, dtype=np.int64), (count,)).copy()
+    declarer = np.broadcast_to(np.asarray(declarer, dtype=np.int64), (count,))
+    points = np.zeros(count, dtype=np.int32) if points is None else np.array(points, dtype=np.int32)
+    tricks_won = np.zeros(count, dtype=np.int32) if tricks_won is None else np.array(tricks_won, dtype=np.int32)
+
+    current = np.zeros((count, 3), dtype=np.int64)
+    played = 0
+    if trick is not None and np.size(trick):
+        trick = np.asarray(trick, dtype=np.int64).reshape(count, -1)
+        played = trick.shape[1]
+        current[:, :played] = trick
+
+    while played or hands[rows, leader].any():
+        for offset in range(played, 3):
+            seat = (leader + offset) % 3
+            hand = hands[rows, seat]
+            legal = legal_moves(game_index, hand, current[:, 0] if offset else None)
+            # Adding uniform noise to the legal mask makes argmax a uniform pick among legal cards.
+            cards = (legal + rng.random(legal.shape)).argmax(axis=1)
+            hands[rows, seat, cards] = False
+            current[:, offset] = cards
+        played = 0
+        winner = (leader + trick_winners(game_index, current)) % 3
+        declarer_trick = winner == declarer
+        points += np.where(declarer_trick, CARD_POINTS[current].sum(axis=1), 0)
+        tricks_won += declarer_trick
+        leader = winner
+
+    wins = np.where(game_index == cc.NULL, tricks_won == 0, points >= 61)
+    return np.where(wins, 1, -1)
+
+
+def run_records(records, rollouts=1, rng=None):
+    """Roll out stateCodec.GameStateRecord positions; return the mean reward per record.
+
+    Records must share the point of play (cards left and cards in the current trick).
+    """
+    records = list(records)
+    game_index = np.repeat([record.game_index for record in records], rollouts)
+    hands = np.repeat(masks_to_matrix([record.hands for record in records]), rollouts, axis=0)
+    leader = np.repeat([record.leader for record in records], rollouts)
+    declarer = np.repeat([record.declarer for record in records], rollouts)
+    trick = np.repeat([record.trick for record in records], rollouts, axis=0)
+    points = np.repeat([record.points[record.declarer] +
+                        (cc.mask_points(record.skat) if record.game_index != cc.NULL else 0)
+                        for record in records], rollouts)
+    tricks_won = np.repeat([record.tricks[record.declarer] for record in records], rollouts)
+    rewards = run(game_index, hands, leader, declarer, trick, points, tricks_won, rng)
+    return rewards.reshape(len(records), rollouts).mean(axis=1)
@@ -1,7 +1,24 @@
 import random
-from game.skat.cards import Card
+from game.skat import cards
+from common.constants import SUITS, RANKS
 from enum import Enum
 
+
+class Deck:
+    # A shuffled deck of the pygame card sprites drawn by the client.
+
+    def __init__(self):
+        self.cards = [cards.Card(suit, rank) for suit in SUITS for rank in RANKS]
+        self.skat = []
+        random.shuffle(self.cards)
+
+    def deal(self, players, hand_size=10):
+        # Deal hand_size cards to each player; the remaining cards form the skat.
+        hands = [self.cards[i * hand_size:(i + 1) * hand_size] for i in range(players)]
+        self.skat = self.cards[players * hand_size:]
+        return hands
+
+
 class Card:
     # Represents a card in a Skat deck with suits and faces.
     
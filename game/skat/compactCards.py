@@ -0,0 +1,211 @@
+import random
+from game.skat.gameType import GameType
+
+# Compact card encoding shared by the fast simulators.
+# A card is an integer 0..31 (suit * 8 + face) and a set of cards is a 32 bit mask.
+# Card names follow the "suit-rank" strings used by SkatGameState in mcts.py.
+
+SUIT_NAMES = ['clubs', 'spades', 'hearts', 'diamonds']
+RANK_NAMES = ['7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
+
+NUM_CARDS = 32
+FULL_DECK = (1 << NUM_CARDS) - 1
+JACK = RANK_NAMES.index('jack')
+TRUMP = 4  # Effective suit index used for trump cards
+
+CARD_NAMES = [f"{suit}-{rank}" for suit in SUIT_NAMES for rank in RANK_NAMES]
+CARD_INDEX = {name: index for index, name in enumerate(CARD_NAMES)}
+
+_RANK_POINTS = {'jack': 2, 'queen': 3, 'king': 4, '10': 10, 'ace': 11}
+CARD_POINTS = [_RANK_POINTS.get(RANK_NAMES[index % 8], 0) for index in range(NUM_CARDS)]
+
+JACK_MASK = sum(1 << (suit * 8 + JACK) for suit in range(4))
+SUIT_MASKS = [0xFF << (suit * 8) for suit in range(4)]
+
+GAME_TYPES = [GameType.CLUBS, GameType.SPADES, GameType.HEARTS, GameType.DIAMONDS, GameType.GRAND, GameType.NULL]
+GAME_TYPE_INDEX = {game_type: index for index, game_type in enumerate(GAME_TYPES)}
+GRAND = GAME_TYPE_INDEX[GameType.GRAND]
+NULL = GAME_TYPE_INDEX[GameType.NULL]
+
+# Base values of Clubs, Spades, Hearts, Diamonds and Grand; Null has a fixed value.
+BASE_VALUES = [12, 11, 10, 9, 24]
+NULL_VALUE = 23
+
+# Plain (non-trump) order in trump games: 7 8 9 Q K 10 A, jacks are always trumps.
+_PLAIN_ORDER = [0, 1, 2, 5, -1, 3, 4, 6]
+
+
+def _build_tables(game_index):
+    #Return (effective suit, power, follow masks) for one game type.
+    effective_suit = [0] * NUM_CARDS
+    power = [0] * NUM_CARDS
+    for card in range(NUM_CARDS):
+        suit, face = divmod(card, 8)
+        if game_index == NULL:
+            effective_suit[card] = suit
+            power[card] = face
+        elif face == JACK:
+            effective_suit[card] = TRUMP
+            power[card] = 200 + (3 - suit)  # Club jack is the highest trump
+        elif suit == game_index:
+            effective_suit[card] = TRUMP
+            power[card] = 100 + _PLAIN_ORDER[face]
+        else:
+            effective_suit[card] = suit
+            power[card] = _PLAIN_ORDER[face]
+    follow_masks = [0] * 5
+    for card in range(NUM_CARDS):
+        follow_masks[effective_suit[card]] |= 1 << card
+    return effective_suit, power, follow_masks
+
+
+_TABLES = [_build_tables(game_index) for game_index in range(len(GAME_TYPES))]
+EFFECTIVE_SUIT = [tables[0] for tables in _TABLES]
+POWER = [tables[1] for tables in _TABLES]
+FOLLOW_MASKS = [tables[2] for tables in _TABLES]
+
+
+def cards_to_mask(cards):
+    """Convert an iterable of "suit-rank" strings into a card mask."""
+    mask = 0
+    for card in cards:
+        mask |= 1 << CARD_INDEX[card]
+    return mask
+
+
+def mask_to_cards(mask):
+    """Convert a card mask into a list of "suit-rank" strings."""
+    return [CARD_NAMES[index] for index in iter_bits(mask)]
+
+
+def iter_bits(mask):
+    """Yield the card indices set in a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_points(mask):
+    """Return the card points held in a mask."""
+    return sum(CARD_POINTS[index] for index in iter_bits(mask))
+
+
+def legal_mask(game_index, hand, lead_card=None):
+    """Return the mask of cards in hand that may be played on lead_card."""
+    if lead_card is None:
+        return hand
+    follow = hand & FOLLOW_MASKS[game_index][EFFECTIVE_SUIT[game_index][lead_card]]
+    return follow if follow else hand
+
+
+def trick_winner(game_index, cards):
+    """Return the offset (0..2) from the leader of the card that wins the trick."""
+    effective_suit = EFFECTIVE_SUIT[game_index]
+    power = POWER[game_index]
+    lead_suit = effective_suit[cards[0]]
+    best = 0
+    for offset in (1, 2):
+        card = cards[offset]
+        suit = effective_suit[card]
+        if suit != lead_suit and suit != TRUMP:
+            continue
+        best_suit = effective_suit[cards[best]]
+        if suit == TRUMP and best_suit != TRUMP or power[card] > power[cards[best]] and suit == best_suit:
+            best = offset
+    return best
+
+
+def random_playout(game_index, hands, leader=0, declarer=0, rng=random, trick=()):
+    """Play the remaining cards randomly and return (declarer points, declarer tricks).
+
+    hands is a list of three masks and is not modified. trick holds the cards already
+    played to the current trick, starting with the leader's.
+    """
+    hands = list(hands)
+    points = 0
+    tricks = 0
+    choice = rng.choice
+    player = leader
+    played = len(trick)
+    trick = list(trick) + [0] * (3 - played)
+    while hands[player] or played:
+        lead_card = trick[0] if played else None
+        for offset in range(played, 3):
+            seat = (player + offset) % 3
+            card = choice(list(iter_bits(legal_mask(game_index, hands[seat], lead_card))))
+            hands[seat] ^= 1 << card
+            trick[offset] = card
+            if lead_card is None:
+                lead_card = card
+        played = 0
+        player = (player + trick_winner(game_index, trick)) % 3
+        if player == declarer:
+            tricks += 1
+            points += CARD_POINTS[trick[0]] + CARD_POINTS[trick[1]] + CARD_POINTS[trick[2]]
+    return points, tricks
+
+
+def declarer_wins(game_index, points, tricks):
+    """Return True if the declarer wins with the given card points and trick count."""
+    if game_index == NULL:
+        return tricks == 0
+    return points >= 61
+
+
+def canonical_key(game_index, *masks):
+    """Return a key identifying masks up to the suit permutations allowed by the game type.
+
+    Null treats all four suits alike, Grand all four suits apart from the jacks, and a
+    suit game the three non-trump suits, so suit games with different trumps share keys.
+    """
+    jack_bits = ()
+    if game_index != NULL:
+        jack_bits = tuple(mask & JACK_MASK for mask in masks)
+        masks = [mask & ~JACK_MASK for mask in masks]
+    columns = [tuple((mask >> (suit * 8)) & 0xFF for mask in masks) for suit in range(4)]
+    if game_index == NULL or game_index == GRAND:
+        return game_index, jack_bits, tuple(sorted(columns))
+    trump_column = columns.pop(game_index)
+    return 'suit', jack_bits, trump_column, tuple(sorted(columns))
+
+
+def canonical_game(game_index):
+    """Return the game type index used for canonical hands."""
+    return 0 if game_index < GRAND else game_index
+
+
+def jack_multiplier(mask):
+    """Return the jack multiplier of a hand mask, computed as Hand.get_jack_multiplier does.
+
+    With the club jack it counts the successive jacks from the top ("with"), otherwise the
+    jacks missing above the highest one held ("without"); a hand without jacks counts 4.
+    """
+    jacks = [suit for suit in range(4) if mask >> (suit * 8 + JACK) & 1]
+    if not jacks:
+        return 4
+    if jacks[0] != 0:
+        return jacks[0]
+    count = 1
+    while count < len(jacks) and jacks[count] == count:
+        count += 1
+    return count
+
+
+def game_value(game_index, mask):
+    """Return the value of a game for the declarer's twelve cards, without Schneider or Schwarz.
+
+    A trump game is worth its base value times one more than the jack multiplier.
+    """
+    if game_index == NULL:
+        return NULL_VALUE
+    return BASE_VALUES[game_index] * (jack_multiplier(mask) + 1)
+
+
+def lost_value(game_index, mask, bid):
+    """Return what the declarer loses: twice the game value, raised to cover an overbid."""
+    value = game_value(game_index, mask)
+    if value < bid:
+        base = NULL_VALUE if game_index == NULL else BASE_VALUES[game_index]
+        value = -(-bid // base) * base
+    return 2 * value
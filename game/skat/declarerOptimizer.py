@@ -0,0 +1,208 @@
+import math
+import random
+import time
+from itertools import combinations
+from typing import NamedTuple, List, Optional
+
+from game.skat import compactCards as cc
+
+
+class DeclarerDecision(NamedTuple):
+    discard: List[str]
+    game_type: str
+    win_rate: float
+    samples: int
+    expected_value: float
+
+
+class _Candidate:
+    def __init__(self, hand, skat, game_index, stakes, declarer_offset):
+        #stakes is (game value, lost value, overbid), the same for every discard of one game type.
+        self.hand = hand
+        self.skat = skat
+        self.game_index = game_index
+        self.value, self.loss, self.overbid = stakes
+        self.declarer_offset = declarer_offset
+        self._key = None
+
+    @property
+    def key(self):
+        # Computed on first use, so candidates dropped by pruning never pay for it.
+        if self._key is None:
+            self._key = (self.declarer_offset, cc.canonical_key(self.game_index, self.hand, self.skat))
+        return self._key
+
+    def discard_cards(self):
+        return cc.mask_to_cards(self.skat)
+
+    def expected_value(self, win_rate):
+        #Expected score of the game; a game worth less than the bid is lost whatever the cards do.
+        if self.overbid:
+            return -self.loss
+        return win_rate * self.value - (1 - win_rate) * self.loss
+
+
+class DeclarerOptimizer:
+    def __init__(self, budget=0.5, batch_size=8, max_samples=400, confidence=2.0, cache_size=100000, rng=None):
+        """Score every (discard, game type) pair for a declarer holding twelve cards."""
+        self.budget = budget
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+        self.confidence = confidence
+        self.cache_size = cache_size
+        self.rng = rng or random.Random()
+        # (declarer offset from forehand, canonical hand key) -> [wins, samples], shared across calls.
+        self.cache = {}
+        self.sample_time = 0.0  # Measured seconds per playout
+
+    def choose(self, cards, game_types=None, budget=None, bid=18, declarer=0, forehand=0) -> Optional[DeclarerDecision]:
+        #Return the discard and game type with the best expected score for the declarer's twelve cards.
+        if len(cards) != 12:
+            raise ValueError("The declarer must hold exactly twelve cards to discard.")
+        deadline = time.perf_counter() + (self.budget if budget is None else budget)
+        full_hand = cc.cards_to_mask(cards)
+        game_indices = [cc.GAME_TYPE_INDEX[game_type] for game_type in (game_types or cc.GAME_TYPES)]
+        seats = (declarer, forehand)
+        stakes = {}
+        for game_index in game_indices:
+            value = cc.game_value(game_index, full_hand)
+            stakes[game_index] = (value, cc.lost_value(game_index, full_hand, bid), value < bid)
+
+        candidates = []
+        for pair in combinations(cc.iter_bits(full_hand), 2):
+            skat = (1 << pair[0]) | (1 << pair[1])
+            for game_index in game_indices:
+                candidates.append(_Candidate(full_hand ^ skat, skat, game_index, stakes[game_index],
+                                             (declarer - forehand) % 3))
+
+        alive = self.prune_dominated(candidates)
+        # One cheap pass first, most promising by a static prior first, so every candidate the
+        # budget allows has an estimate before the racing starts.
+        alive.sort(key=self.prior, reverse=True)
+        started = time.perf_counter()
+        sampled = 0
+        for index, candidate in enumerate(alive):
+            if time.perf_counter() >= deadline:
+                alive = alive[:index] or alive[:1]
+                break
+            if not self.samples(candidate):
+                self.evaluate(candidate, 1, seats)
+                sampled += 1
+        if sampled:
+            self.sample_time = (time.perf_counter() - started) / sampled
+        sample_time = self.sample_time
+        while len(alive) > 1 and time.perf_counter() < deadline:
+            alive.sort(key=self.expected_value, reverse=True)
+            # Without time for another full round, keep the better half (successive halving)
+            # rather than letting the deadline cut the round at an arbitrary candidate.
+            remaining = deadline - time.perf_counter()
+            while len(alive) > 2 and len(alive) * self.batch_size * sample_time > remaining:
+                alive = alive[:len(alive) // 2]
+            progressed = False
+            for candidate in alive:
+                if self.samples(candidate) < self.max_samples:
+                    self.evaluate(candidate, self.batch_size, seats)
+                    progressed = True
+                if time.perf_counter() >= deadline:
+                    break
+            if not progressed:
+                break
+            alive = self.race(alive)
+
+        if not alive:
+            return None
+        best = max(alive, key=self.rank)
+        return DeclarerDecision(best.discard_cards(), cc.GAME_TYPES[best.game_index],
+                                self.win_rate(best), self.samples(best), self.expected_value(best))
+
+    def prune_dominated(self, candidates):
+        #Drop candidates that are obviously worse than a sibling with the same game type.
+        alive = []
+        for candidate in candidates:
+            game_index = candidate.game_index
+            # Putting jacks or trumps away only helps the defenders in a trump game.
+            if game_index != cc.NULL:
+                trump_mask = cc.FOLLOW_MASKS[game_index][cc.TRUMP]
+                if candidate.skat & trump_mask and candidate.hand & ~trump_mask:
+                    continue
+            # In Null, discarding the lowest card of a suit while keeping a higher one never helps.
+            elif self._discards_null_guard(candidate):
+                continue
+            alive.append(candidate)
+        return alive or candidates
+
+    @staticmethod
+    def _discards_null_guard(candidate):
+        for card in cc.iter_bits(candidate.skat):
+            suit_mask = cc.SUIT_MASKS[card // 8]
+            lower = candidate.hand & suit_mask & ((1 << card) - 1)
+            higher = candidate.hand & suit_mask & ~((1 << (card + 1)) - 1)
+            if higher and not lower:
+                return True
+        return False
+
+    @staticmethod
+    def prior(candidate):
+        #Static guess at a candidate's strength, used to order the first pass.
+        hand, game_index = candidate.hand, candidate.game_index
+        if game_index == cc.NULL:
+            # Low cards keep a Null safe; every card above the 9 is a risk.
+            return sum(1 for card in cc.iter_bits(hand) if card % 8 <= 2) - 10
+        trumps = bin(hand & cc.FOLLOW_MASKS[game_index][cc.TRUMP]).count('1')
+        aces = sum(1 for suit in range(4) if hand >> (suit * 8 + 7) & 1 and suit != game_index)
+        return trumps + aces + cc.mask_points(candidate.skat) / 11
+
+    def rank(self, candidate):
+        #Final ranking: the lower bound, so a lucky candidate with a handful of samples does not
+        #win; when the budget allowed less than a batch, the estimate and then the prior.
+        if self.samples(candidate) >= self.batch_size:
+            return 1, self.bounds(candidate)[0], self.expected_value(candidate)
+        return 0, self.expected_value(candidate), self.prior(candidate)
+
+    def race(self, candidates):
+        #Keep only candidates whose upper confidence bound reaches the best lower bound.
+        bounds = [self.bounds(candidate) for candidate in candidates]
+        best_lower = max(lower for lower, _ in bounds)
+        return [candidate for candidate, (_, upper) in zip(candidates, bounds) if upper >= best_lower]
+
+    def bounds(self, candidate):
+        #Confidence bounds on the expected score, from those on the win rate.
+        samples = self.samples(candidate)
+        if samples == 0:
+            return candidate.expected_value(0.0), candidate.expected_value(1.0)
+        rate = self.win_rate(candidate)
+        margin = self.confidence * math.sqrt(max(rate * (1 - rate), 0.25 / samples) / samples)
+        return candidate.expected_value(max(rate - margin, 0.0)), candidate.expected_value(min(rate + margin, 1.0))
+
+    def evaluate(self, candidate, count, seats=(0, 0)):
+        #Add count random deals of the defenders' cards to the candidate's statistics.
+        #seats holds the declarer's seat and the forehand seat, who leads the first trick.
+        stats = self.cache.get(candidate.key)
+        if stats is None:
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            stats = self.cache[candidate.key] = [0, 0]
+        game_index = candidate.game_index
+        declarer, forehand = seats
+        skat_points = 0 if game_index == cc.NULL else cc.mask_points(candidate.skat)
+        unseen = list(cc.iter_bits(cc.FULL_DECK ^ candidate.hand ^ candidate.skat))
+        for _ in range(count):
+            self.rng.shuffle(unseen)
+            hands = [sum(1 << card for card in unseen[:10])] * 3
+            hands[(declarer + 2) % 3] = sum(1 << card for card in unseen[10:])
+            hands[declarer] = candidate.hand
+            points, tricks = cc.random_playout(game_index, hands, forehand, declarer, rng=self.rng)
+            if cc.declarer_wins(game_index, points + skat_points, tricks):
+                stats[0] += 1
+            stats[1] += 1
+
+    def samples(self, candidate):
+        stats = self.cache.get(candidate.key)
+        return stats[1] if stats else 0
+
+    def win_rate(self, candidate):
+        stats = self.cache.get(candidate.key)
+        return stats[0] / stats[1] if stats and stats[1] else 0.0
+
+    def expected_value(self, candidate):
+        return candidate.expected_value(self.win_rate(candidate))
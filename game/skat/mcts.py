@@ -3,6 +3,8 @@ import random
 from copy import deepcopy
 from collections import defaultdict
 
+from game.skat.gameType import GameType
+
 # Node class for MCTS with enhanced capabilities and state management
 class Node:
     def __init__(self, state, parent=None):
@@ -13,7 +15,9 @@ class Node:
         self.visits = 0
         self.value = 0.0
         self.total_points = 0
-        self.untried_actions = state.get_legal_moves()
+        self.prior = 0.0  # Heuristic score of the move leading here, set by the parent
+        # Untried moves sorted by heuristic score, best last, so expand() pops in O(1).
+        self.untried_actions, self.priors = order_moves(state, state.get_legal_moves())
         self.expanded_actions = set()
         self.state_cache = defaultdict(float)
 
@@ -21,22 +25,32 @@ class Node:
         
         return len(self.untried_actions) == 0
 
-    def best_child(self, exploration_weight=1.41):
-        #Select the best child node using UCB1
+    def can_widen(self, widening_constant=None, widening_exponent=0.5):
+        #Progressive widening: allow a new child only once visits justify it.
+        if not self.untried_actions:
+            return False
+        if widening_constant is None or not self.children:
+            return True
+        return len(self.children) < widening_constant * (self.visits + 1) ** widening_exponent
+
+    def best_child(self, exploration_weight=1.41, bias_weight=0.0):
+        #Select the best child node using UCB1 plus a progressive bias that fades with visits
         choices_weights = [
             (child.value / (child.visits + 1e-6)) +
-            exploration_weight * math.sqrt(math.log(self.visits + 1) / (child.visits + 1e-6))
+            exploration_weight * math.sqrt(math.log(self.visits + 1) / (child.visits + 1e-6)) +
+            bias_weight * child.prior / (child.visits + 1)
             for child in self.children
         ]
         return self.children[choices_weights.index(max(choices_weights))]
 
     def expand(self):
         #Expand the node by selecting an untried action and adding the resulting node as a child."""
-        action = self.untried_actions.pop(0)
+        action = self.untried_actions.pop()
         self.expanded_actions.add(action)
         next_state = deepcopy(self.state)
         next_state.perform_move(action)
         child_node = Node(next_state, parent=self)
+        child_node.prior = self.priors.get(action, 0.0)
         self.children.append(child_node)
         return child_node
 
@@ -56,16 +70,29 @@ class Node:
 
 # Enhanced MCTS class for running simulations and choosing optimal moves
 class MCTS:
-    def __init__(self, exploration_weight=1.41, max_depth=100):
-        """Initialize the MCTS algorithm with exploration parameters."""
+    def __init__(self, exploration_weight=1.41, max_depth=100, book=None, batch_rollouts=0,
+                 progressive_bias=0.0, widening_constant=None, widening_exponent=0.5):
+        """Initialize the MCTS algorithm with exploration parameters and an optional opening book.
+
+        With batch_rollouts > 0 each leaf is scored by that many vectorized NumPy rollouts.
+        progressive_bias (off by default) weighs the move-ordering heuristic in selection; widening_constant
+        enables progressive widening, allowing widening_constant * visits ** widening_exponent children.
+        """
         self.exploration_weight = exploration_weight
+        self.progressive_bias = progressive_bias
+        self.widening_constant = widening_constant
+        self.widening_exponent = widening_exponent
         self.max_depth = max_depth
+        self.book = book
+        self.batch_rollouts = batch_rollouts
         self.state_cache = {}
 
     def select(self, node):
         #Select the most promising node using UCT until a non-terminal, non-fully expanded node is found."
-        while not node.is_terminal_node() and node.is_fully_expanded():
-            node = node.best_child(self.adjust_exploration_rate(node))
+        while not node.is_terminal_node() and not node.can_widen(self.widening_constant, self.widening_exponent):
+            if not node.children:
+                break
+            node = node.best_child(self.adjust_exploration_rate(node), self.progressive_bias)
         return node
 
     def adjust_exploration_rate(self, node):
@@ -80,6 +107,8 @@ class MCTS:
 
     def simulate(self, node):
         #Simulate a game from the current node's state until a terminal state is reached or max depth.
+        if self.batch_rollouts:
+            return self.simulate_batch(node)
         current_state = deepcopy(node.state)
         depth = 0
         while not current_state.is_terminal() and depth < self.max_depth:
@@ -90,6 +119,12 @@ class MCTS:
             depth += 1
         return current_state.get_reward()
 
+    def simulate_batch(self, node):
+        #Average the declarer's reward over many lockstep rollouts of the node's state.
+        from game.skat import batchRollout, stateCodec
+        record = stateCodec.from_skat_game_state(node.state)
+        return float(batchRollout.run_records([record], self.batch_rollouts)[0])
+
     def rollout_policy(self, legal_moves, state):
         """Choose a move during rollout using a weighted random strategy."""
         if state in self.state_cache:
@@ -119,26 +154,52 @@ class MCTS:
             reward = -reward  # Alternate perspective for the opponent
             node = node.parent
 
-    def run(self, initial_state, itermax=1000):
-        #Run the MCTS algorithm for a given number of iterations and return the best child.
-        root = Node(initial_state)
-        for _ in range(itermax):
+    def search(self, root, itermax=None, should_stop=None, on_progress=None, progress_every=100):
+        #Grow the tree under root until itermax iterations are done or should_stop() returns True.
+        if self.book is not None and not root.children:
+            book_move = self.book.lookup_state(root.state)
+            if book_move is not None and book_move in root.untried_actions:
+                # Opening book hit: the widest positions of the game need no search.
+                root.untried_actions.remove(book_move)
+                root.untried_actions.append(book_move)
+                root.expand()
+                return root
+        iteration = 0
+        while itermax is None or iteration < itermax:
+            if should_stop is not None and should_stop():
+                break
             node = self.select(root)
-            if not node.is_fully_expanded() and not node.is_terminal_node():
+            if node.can_widen(self.widening_constant, self.widening_exponent) and not node.is_terminal_node():
                 node = node.expand()
             reward = self.simulate(node)
             self.backpropagate(node, reward)
+            iteration += 1
+            if on_progress is not None and iteration % progress_every == 0:
+                on_progress(iteration, root)
+        return root
+
+    def run(self, initial_state, itermax=1000):
+        #Run the MCTS algorithm for a given number of iterations and return the best child.
+        root = self.search(Node(initial_state), itermax)
         return root.best_child(0)
 
 # SkatGameState class with comprehensive game logic and strategic enhancements
 class SkatGameState:
-    def __init__(self, current_player, cards_in_hand, trick_cards, score, trump_suit=None):
-        """Initialize a Skat game state."""
+    def __init__(self, current_player, cards_in_hand, trick_cards, score, trump_suit=None, game_type=None,
+                 skat=None):
+        """Initialize a Skat game state.
+
+        score holds the card points each player took before this state in tricks that are not
+        in tricks_won. game_type (a GameType value) and skat (the declarer's two cards) are
+        optional; the skat counts for the declarer and a Null game is scored by tricks.
+        """
         self.current_player = current_player
         self.cards_in_hand = cards_in_hand
         self.trick_cards = trick_cards
         self.score = score
         self.trump_suit = trump_suit
+        self.game_type = game_type
+        self.skat = skat
         self.tricks_won = {player: [] for player in cards_in_hand}
         self.last_move = None
 
@@ -146,34 +207,48 @@ class SkatGameState:
         #Return the list of legal moves for the current player.
         current_hand = self.cards_in_hand[self.current_player]
         if not self.trick_cards:
-            return current_hand  # Any card can be played if the trick is empty
-        lead_suit = self.trick_cards[0].split('-')[0]
-        playable_cards = [card for card in current_hand if card.split('-')[0] == lead_suit]
-        return playable_cards if playable_cards else current_hand  # Must follow suit if possible
+            return list(current_hand)  # Any card can be played if the trick is empty
+        lead_suit = self.effective_suit(self.trick_cards[0])
+        playable_cards = [card for card in current_hand if self.effective_suit(card) == lead_suit]
+        return playable_cards if playable_cards else list(current_hand)  # Must follow suit if possible
 
     def perform_move(self, card):
         #Execute a move by the current player, updating the game state.
         self.trick_cards.append(card)
         self.cards_in_hand[self.current_player].remove(card)
         self.last_move = card
+        self.current_player = (self.current_player + 1) % 3
         if len(self.trick_cards) == 3:
             self.resolve_trick()
 
     def resolve_trick(self):
         #Determine the winner of the current trick and update the state accordingly.
-        winning_card = max(self.trick_cards, key=self.card_strength)
+        lead_suit = self.effective_suit(self.trick_cards[0])
+        winning_card = max(self.trick_cards, key=lambda card: self.card_strength(card, lead_suit))
         winner = (self.current_player + self.trick_cards.index(winning_card)) % 3
         self.tricks_won[winner].append(list(self.trick_cards))
         self.trick_cards = []
         self.current_player = winner
 
-    def card_strength(self, card):
-        #Evaluate the strength of a card, considering trump suit and rank.
+    def effective_suit(self, card):
+        #Return the suit a card belongs to when following: 'trump' for jacks and the trump suit outside Null.
         suit, rank = card.split('-')
-        is_trump = suit == self.trump_suit or rank == 'jack'
-        rank_order = ['jack', 'ace', '10', 'king', 'queen', '9', '8', '7'] if is_trump else ['ace', '10', 'king', 'queen', 'jack', '9', '8', '7']
-        rank_index = rank_order.index(rank)
-        return (1 if is_trump else 0, rank_index)
+        if self.game_type != GameType.NULL and (rank == 'jack' or suit == self.trump_suit):
+            return 'trump'
+        return suit
+
+    def card_strength(self, card, lead_suit=None):
+        #Evaluate the strength of a card in a trick led in lead_suit (an effective suit); higher wins.
+        suit, rank = card.split('-')
+        if self.game_type == GameType.NULL:
+            return (1, NULL_ORDER.index(rank)) if suit == lead_suit else (0, 0)
+        if rank == 'jack':
+            return 3, JACK_ORDER.index(suit)
+        if suit == self.trump_suit:
+            return 2, TRUMP_ORDER.index(rank)
+        if suit == lead_suit:
+            return 1, TRUMP_ORDER.index(rank)
+        return 0, 0  # Neither trump nor following suit: cannot win the trick
 
     def is_terminal(self):
         #Check if the game is in a terminal state (all cards have been played).
@@ -186,13 +261,55 @@ class SkatGameState:
     def get_reward(self):
         #Calculate the reward for the current game state, focusing on declarer's score."""
         declarer = 0  # For simplicity, assuming player 0 is the declarer
+        if self.game_type == GameType.NULL:
+            return -1 if self.tricks_won[declarer] else 1  # Null is won by taking no trick
         declarer_points = sum(card_value(card) for trick in self.tricks_won[declarer] for card in trick)
+        declarer_points += self.score[declarer] + sum(card_value(card) for card in self.skat or ())
         return 1 if declarer_points >= 61 else -1  # Declarer wins if points >= 61
 
     def get_tricks_cards(self, player):
         #Return all cards won by a specific player."""
         return [card for trick in self.tricks_won[player] for card in trick] if self.tricks_won[player] else []
 
+# Card orders used by SkatGameState.card_strength, lowest first
+TRUMP_ORDER = ['7', '8', '9', 'queen', 'king', '10', 'ace']
+JACK_ORDER = ['diamonds', 'hearts', 'spades', 'clubs']
+NULL_ORDER = ['7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
+
+
+# Move ordering heuristic used to sort untried moves and as the progressive bias prior
+def heuristic_score(state, card):
+    """Cheap score of a move: winning the trick, saving points when losing, creating voids."""
+    suit, rank = card.split('-')
+    hand = state.cards_in_hand[state.current_player]
+    score = 1.0
+    if state.trick_cards:
+        # Judged with the rules resolve_trick applies, so the heuristic agrees with the tree.
+        lead_suit = state.effective_suit(state.trick_cards[0])
+        strength = state.card_strength(card, lead_suit)
+        best = max(state.card_strength(played, lead_suit) for played in state.trick_cards)
+        if strength > best:
+            # Winning the trick is worth more the more points are already on the table.
+            score += 3.0 + sum(card_value(played) for played in state.trick_cards) / 11.0
+        else:
+            score += 2.0 * (11 - card_value(card)) / 11.0  # Losing: throw off as few points as possible
+    elif rank == 'ace' and suit != state.trump_suit:
+        score += 2.0  # Cashing a side ace while it still stands
+    elif rank == 'jack' or suit == state.trump_suit:
+        score += 1.0
+    if rank != 'jack' and suit != state.trump_suit and \
+            sum(1 for held in hand if held.startswith(f"{suit}-") and not held.endswith('-jack')) == 1:
+        score += 1.0  # Playing the last card of a side suit creates a void
+    return score
+
+
+def order_moves(state, moves):
+    """Return (moves sorted by heuristic score with the best last, {move: prior in [0, 1]})."""
+    scores = {move: heuristic_score(state, move) for move in moves}
+    top = max(scores.values(), default=1.0)
+    return sorted(moves, key=scores.__getitem__), {move: score / top for move, score in scores.items()}
+
+
 # Helper function to evaluate card value
 def card_value(card):
     """Return the value of a card for scoring purposes."""
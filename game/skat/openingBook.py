@@ -0,0 +1,245 @@
+import argparse
+import mmap
+import random
+import struct
+import time
+from multiprocessing import Pool
+
+from game.skat import compactCards as cc
+
+# On-disk opening book: a header followed by an open-addressing hash table of fixed-size
+# records, read through mmap so a lookup touches a handful of bytes and no parsing happens.
+#
+# A position is the hand of the player to move in the first trick, the game type, where
+# the declarer sits relative to the player to move, and the led card when responding.
+# Exact hands almost never repeat between deals, so positions are keyed on a coarse
+# abstraction that does: the trumps held (count and club jack), each side suit's length
+# and ace, and the slot and rank of the led card. Suits are ranked into slots by those
+# features, and a recommended move is the highest or lowest legal card of one slot.
+
+MAGIC = b'SKATBOOK'
+VERSION = 2
+HEADER = struct.Struct('<8sII')  # magic, version, capacity
+RECORD = struct.Struct('<QBBHf')  # key + 1 (0 marks an empty slot), move, unused, samples, win rate
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+ACE = cc.RANK_NAMES.index('ace')
+
+
+def _suit_feature(hand, suit, low_card):
+    #Length (capped at 3) and whether the suit's ace, or in Null its 7, is held; jacks excluded.
+    cards = hand & cc.SUIT_MASKS[suit] & ~cc.JACK_MASK
+    return min(bin(cards).count('1'), 3) | (cards >> (suit * 8 + (0 if low_card else ACE)) & 1) << 2
+
+
+def position_key(game_index, hand, declarer_offset, lead_card=None):
+    """Return (abstract key, slots) for a first-trick position.
+
+    declarer_offset is 0 when the player to move is the declarer, otherwise the number
+    of seats after the player to move at which the declarer sits. slots lists the
+    effective suits (compactCards.TRUMP first in trump games) in the order the key uses.
+    """
+    null = game_index == cc.NULL
+    sides = [suit for suit in range(4) if suit != game_index]
+    features = {suit: _suit_feature(hand, suit, null) for suit in sides}
+    sides.sort(key=features.__getitem__, reverse=True)
+    slots = sides if null else [cc.TRUMP] + sides
+    key = cc.canonical_game(game_index) | declarer_offset << 3
+    if lead_card is not None:
+        slot = slots.index(cc.EFFECTIVE_SUIT[game_index][lead_card])
+        key |= (1 + slot * 2 + (lead_card % 8 == ACE)) << 5
+    shift = 9
+    if not null:
+        trumps = bin(hand & cc.FOLLOW_MASKS[game_index][cc.TRUMP]).count('1')
+        key |= (hand >> cc.JACK & 1 | min(trumps, 6) << 1) << shift
+        shift += 4
+    for suit in sides:
+        key |= features[suit] << shift
+        shift += 4
+    return key, slots
+
+
+def move_card(game_index, hand, lead_card, slots, move):
+    """Return the card a book move stands for, or None if no legal card fits it.
+
+    A move is slot * 2 + 1 for the strongest legal card of that slot and slot * 2 for the weakest.
+    """
+    legal = cc.legal_mask(game_index, hand, lead_card) & cc.FOLLOW_MASKS[game_index][slots[move // 2]]
+    if not legal:
+        return None
+    power = cc.POWER[game_index]
+    pick = max if move & 1 else min
+    return pick(cc.iter_bits(legal), key=power.__getitem__)
+
+
+def position_moves(game_index, hand, lead_card, slots):
+    """Return {move: card} for every book move with a legal card in the position."""
+    moves = {}
+    for move in range(len(slots) * 2):
+        card = move_card(game_index, hand, lead_card, slots, move)
+        if card is not None:
+            moves[move] = card
+    return moves
+
+
+def _slot(key, capacity):
+    return ((key * _HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> 11 & (capacity - 1)
+
+
+class OpeningBook:
+    def __init__(self, path):
+        """Open a book file written by write_book for O(1) lookups."""
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.capacity = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an opening book of version {VERSION}.")
+
+    def lookup(self, game_index, hand, declarer_offset, lead_card=None):
+        """Return the recommended card index for a position, or None if the book misses."""
+        key, slots = position_key(game_index, hand, declarer_offset, lead_card)
+        slot = _slot(key, self.capacity)
+        for _ in range(self.capacity):
+            stored, move, _, _, _ = RECORD.unpack_from(self.data, HEADER.size + slot * RECORD.size)
+            if stored == 0:
+                return None
+            if stored == key + 1:
+                return move_card(game_index, hand, lead_card, slots, move)
+            slot = (slot + 1) & (self.capacity - 1)
+        return None
+
+    def lookup_state(self, state):
+        """Return the recommended "suit-rank" card for a SkatGameState, or None.
+
+        SkatGameState scores player 0 as the declarer. Without a trump suit the game type is
+        taken from state.game_type, and a state that does not name one gets no book move.
+        """
+        hand = state.cards_in_hand[state.current_player]
+        if len(hand) != 10 or len(state.trick_cards) > 1:
+            return None
+        if state.trump_suit in cc.SUIT_NAMES:
+            game_index = cc.SUIT_NAMES.index(state.trump_suit)
+        elif getattr(state, 'game_type', None) == cc.GAME_TYPES[cc.GRAND]:
+            game_index = cc.GRAND
+        else:
+            return None
+        lead_card = cc.CARD_INDEX[state.trick_cards[0]] if state.trick_cards else None
+        card = self.lookup(game_index, cc.cards_to_mask(hand), -state.current_player % 3, lead_card)
+        return None if card is None else cc.CARD_NAMES[card]
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __len__(self):
+        return sum(1 for slot in range(self.capacity)
+                   if RECORD.unpack_from(self.data, HEADER.size + slot * RECORD.size)[0])
+
+
+def write_book(path, entries, load_factor=0.5):
+    """Write {key: (move, samples, win rate)} entries as a book file."""
+    capacity = 1
+    while capacity * load_factor < max(len(entries), 1):
+        capacity *= 2
+    buffer = bytearray(HEADER.size + capacity * RECORD.size)
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, capacity)
+    for key, (move, samples, win_rate) in entries.items():
+        slot = _slot(key, capacity)
+        while RECORD.unpack_from(buffer, HEADER.size + slot * RECORD.size)[0]:
+            slot = (slot + 1) & (capacity - 1)
+        RECORD.pack_into(buffer, HEADER.size + slot * RECORD.size, key + 1, move, 0, min(samples, 0xFFFF), win_rate)
+    with open(path, 'wb') as book_file:
+        book_file.write(buffer)
+
+
+def evaluate_position(game_index, hand, declarer_offset, lead_card, playouts, rng):
+    #Random playouts of every book move in one deal; return {move: wins for the mover}.
+    unseen = list(cc.iter_bits(cc.FULL_DECK ^ hand ^ (0 if lead_card is None else 1 << lead_card)))
+    trick = () if lead_card is None else (lead_card,)
+    mover = len(trick)
+    declarer = (mover + declarer_offset) % 3
+    _, slots = position_key(game_index, hand, declarer_offset, lead_card)
+    results = {}
+    for move, card in position_moves(game_index, hand, lead_card, slots).items():
+        wins = 0
+        for _ in range(playouts):
+            rng.shuffle(unseen)
+            hands = [0, 0, 0]
+            hands[mover] = hand ^ (1 << card)
+            # The leader has already played one card when we respond, so it holds nine.
+            others = [(mover + 1) % 3, (mover + 2) % 3]
+            sizes = [10 - (seat < mover) for seat in others]
+            hands[others[0]] = sum(1 << unseen_card for unseen_card in unseen[:sizes[0]])
+            hands[others[1]] = sum(1 << unseen_card for unseen_card in unseen[sizes[0]:sizes[0] + sizes[1]])
+            skat = sum(1 << unseen_card for unseen_card in unseen[sizes[0] + sizes[1]:])
+            points, tricks = cc.random_playout(game_index, hands, 0, declarer, rng, trick + (card,))
+            if game_index != cc.NULL:
+                points += cc.mask_points(skat)
+            wins += cc.declarer_wins(game_index, points, tricks) == (declarer_offset == 0)
+        results[move] = wins
+    return results
+
+
+def _build_positions(args):
+    #Worker: sample deals and sum playout results per position key, {key: {move: [wins, playouts]}}.
+    count, playouts, seed, game_indices = args
+    rng = random.Random(seed)
+    stats = {}
+    for _ in range(count):
+        deck = list(range(cc.NUM_CARDS))
+        rng.shuffle(deck)
+        game_index = rng.choice(game_indices)
+        declarer_offset = rng.randrange(3)
+        hand = sum(1 << card for card in deck[:10])
+        lead_card = deck[10] if rng.random() < 0.5 else None
+        key, _ = position_key(game_index, hand, declarer_offset, lead_card)
+        moves = stats.setdefault(key, {})
+        for move, wins in evaluate_position(game_index, hand, declarer_offset, lead_card, playouts, rng).items():
+            totals = moves.setdefault(move, [0, 0])
+            totals[0] += wins
+            totals[1] += playouts
+    return stats
+
+
+def build_book(path, positions=20000, playouts=4, workers=None, seed=None, game_types=None):
+    """Sample opening deals, play out every book move and write the best move per position key."""
+    seed = random.randrange(1 << 30) if seed is None else seed
+    workers = workers or 1
+    game_indices = [cc.GAME_TYPE_INDEX[game_type] for game_type in (game_types or cc.GAME_TYPES)]
+    chunks = [(positions // workers + (index < positions % workers), playouts, seed + index, game_indices)
+              for index in range(workers)]
+    if workers == 1:
+        results = [_build_positions(chunks[0])]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(_build_positions, chunks)
+    stats = {}
+    for result in results:
+        for key, moves in result.items():
+            for move, (wins, samples) in moves.items():
+                totals = stats.setdefault(key, {}).setdefault(move, [0, 0])
+                totals[0] += wins
+                totals[1] += samples
+    entries = {}
+    for key, moves in stats.items():
+        move, (wins, samples) = max(moves.items(), key=lambda item: item[1][0] / item[1][1])
+        entries[key] = (move, samples, wins / samples)
+    write_book(path, entries)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute an opening-lead book for MCTS.")
+    parser.add_argument('path', help="Book file to write.")
+    parser.add_argument('--positions', type=int, default=20000, help="Opening deals to sample.")
+    parser.add_argument('--playouts', type=int, default=4, help="Random playouts per move and deal.")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    count = build_book(args.path, args.positions, args.playouts, args.workers, args.seed)
+    print(f"Wrote {count} positions to {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import struct
+from multiprocessing import shared_memory
+from typing import NamedTuple, Tuple
+
+from game.skat import compactCards as cc
+
+# Fixed 32 byte layout of a game state, so states can be copied between processes
+# without pickling: four card masks (three hands and the skat), the current trick,
+# who leads, who is to move, the declarer, the game type and per-seat points and tricks.
+RECORD = struct.Struct('<4I3BBBBBB3B3B2x')
+NO_CARD = 0xFF
+COUNT = struct.Struct('<I')
+
+
+class GameStateRecord(NamedTuple):
+    hands: Tuple[int, int, int]
+    skat: int
+    trick: Tuple[int, ...]
+    leader: int
+    to_move: int
+    declarer: int
+    game_index: int
+    points: Tuple[int, int, int]
+    tricks: Tuple[int, int, int]
+
+
+def pack_into(buffer, offset, record):
+    """Write a GameStateRecord into buffer at offset."""
+    trick = tuple(record.trick) + (NO_CARD,) * (3 - len(record.trick))
+    RECORD.pack_into(buffer, offset, *record.hands, record.skat, *trick, len(record.trick), record.leader,
+                     record.to_move, record.declarer, record.game_index, *record.points, *record.tricks)
+
+
+def unpack_from(buffer, offset=0):
+    """Read a GameStateRecord from buffer at offset."""
+    fields = RECORD.unpack_from(buffer, offset)
+    return GameStateRecord(fields[0:3], fields[3], fields[4:4 + fields[7]], fields[8], fields[9], fields[10],
+                           fields[11], fields[12:15], fields[15:18])
+
+
+def encode(record):
+    """Return the 32 byte encoding of a GameStateRecord."""
+    buffer = bytearray(RECORD.size)
+    pack_into(buffer, 0, record)
+    return bytes(buffer)
+
+
+def decode(data):
+    return unpack_from(data, 0)
+
+
+def from_skat_game_state(state, game_index=None, declarer=0):
+    """Build a record from an mcts.SkatGameState.
+
+    SkatGameState plays the declarer as player 0; declarer is the seat that player takes in
+    the record. The game type comes from state.game_type or else from the trump suit (a suit
+    game, or a Grand without one). The skat is state.skat, or the two cards found nowhere
+    else when every won trick is known.
+    """
+    if game_index is None:
+        if state.game_type in cc.GAME_TYPE_INDEX:
+            game_index = cc.GAME_TYPE_INDEX[state.game_type]
+        else:
+            game_index = cc.SUIT_NAMES.index(state.trump_suit) if state.trump_suit in cc.SUIT_NAMES else cc.GRAND
+
+    def seat(player):
+        return (player + declarer) % 3
+
+    hands = [0, 0, 0]
+    points = [0, 0, 0]
+    tricks = [0, 0, 0]
+    seen = cc.cards_to_mask(state.trick_cards)
+    for player in range(3):
+        hands[seat(player)] = cc.cards_to_mask(state.cards_in_hand[player])
+        won = cc.cards_to_mask(card for trick_cards in state.tricks_won[player] for card in trick_cards)
+        points[seat(player)] = state.score[player] + cc.mask_points(won)
+        tricks[seat(player)] = len(state.tricks_won[player])
+        seen |= hands[seat(player)] | won
+    if state.skat is not None:
+        skat = cc.cards_to_mask(state.skat)
+    else:
+        unseen = cc.FULL_DECK ^ seen
+        skat = unseen if bin(unseen).count('1') == 2 else 0
+    trick = tuple(cc.CARD_INDEX[card] for card in state.trick_cards)
+    leader = seat((state.current_player - len(trick)) % 3)
+    return GameStateRecord(tuple(hands), skat, trick, leader, seat(state.current_player), declarer, game_index,
+                           tuple(points), tuple(tricks))
+
+
+def to_skat_game_state(record):
+    """Build an mcts.SkatGameState from a record, with the declarer as player 0.
+
+    The cards of won tricks are not in the record, so each player gets that many empty
+    tricks in tricks_won and their card points in score.
+    """
+    from game.skat.mcts import SkatGameState
+
+    def player(seat):
+        return (seat - record.declarer) % 3
+
+    trump_suit = cc.SUIT_NAMES[record.game_index] if record.game_index < cc.GRAND else None
+    cards_in_hand = {player(seat): cc.mask_to_cards(record.hands[seat]) for seat in range(3)}
+    score = [0, 0, 0]
+    for seat in range(3):
+        score[player(seat)] = record.points[seat]
+    state = SkatGameState(player(record.to_move), cards_in_hand, [cc.CARD_NAMES[card] for card in record.trick],
+                          score, trump_suit, cc.GAME_TYPES[record.game_index], cc.mask_to_cards(record.skat))
+    for seat in range(3):
+        state.tricks_won[player(seat)] = [[] for _ in range(record.tricks[seat])]
+    return state
+
+
+class StateBatch:
+    def __init__(self, capacity=None, name=None):
+        """A batch of encoded states in shared memory.
+
+        Create one with a capacity in the parent, pass its name to the workers and attach
+        there with StateBatch(name=...); only the name crosses the process boundary.
+        """
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=COUNT.size + capacity * RECORD.size)
+            self.owner = True
+            COUNT.pack_into(self.memory.buf, 0, 0)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.capacity = (self.memory.size - COUNT.size) // RECORD.size
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def __len__(self):
+        return COUNT.unpack_from(self.memory.buf, 0)[0]
+
+    def append(self, record):
+        count = len(self)
+        if count >= self.capacity:
+            raise IndexError("StateBatch is full.")
+        pack_into(self.memory.buf, COUNT.size + count * RECORD.size, record)
+        COUNT.pack_into(self.memory.buf, 0, count + 1)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return unpack_from(self.memory.buf, COUNT.size + index * RECORD.size)
+
+    def __setitem__(self, index, record):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        pack_into(self.memory.buf, COUNT.size + index * RECORD.size, record)
+
+    def clear(self):
+        COUNT.pack_into(self.memory.buf, 0, 0)
+
+    def close(self):
+        #Detach; the creating side also frees the shared memory.
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _run_slice(function, name, start, stop):
+    #Worker side of map_batch: attach, decode a slice of the batch and apply function.
+    batch = StateBatch(name=name)
+    try:
+        return [function(batch[index]) for index in range(start, stop)]
+    finally:
+        batch.close()
+
+
+def map_batch(executor, function, records, chunk_size=64):
+    """Apply function to every record in a process pool, shipping states through shared memory.
+
+    function must be a module-level callable taking a GameStateRecord; results come back
+    through the executor, so keep them small. Creating the shared memory costs far more
+    than pickling one 32 byte record, so single states (such as one AI move of the game
+    server) are better sent as encode() bytes.
+    """
+    records = list(records)
+    if not records:
+        return []
+    with StateBatch(len(records)) as batch:
+        for record in records:
+            batch.append(record)
+        futures = [executor.submit(_run_slice, function, batch.name, start, min(start + chunk_size, len(records)))
+                   for start in range(0, len(records), chunk_size)]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    return results
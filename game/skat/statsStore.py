@@ -0,0 +1,182 @@
+import json
+import os
+
+import numpy as np
+
+from game.skat import compactCards as cc
+
+# Columnar store for finished games. Each column is a raw fixed-width file read through
+# np.memmap, so filters and group-bys run as vectorized NumPy over the mapped pages and
+# the store can hold tens of millions of games without loading them.
+
+COLUMNS = {
+    'declarer_hand': np.uint32,    # Declarer's ten cards after the discard, as a card mask
+    'skat': np.uint32,             # The two discarded cards, as a card mask
+    'game_type': np.uint8,         # Index into compactCards.GAME_TYPES
+    'declarer': np.uint8,          # Seat of the declarer
+    'jack_multiplier': np.uint8,   # Hand.get_jack_multiplier of the declarer's twelve cards
+    'jacks': np.uint8,             # Jacks in the declarer's hand
+    'trumps': np.uint8,            # Trumps in the declarer's hand (jacks included)
+    'hand_points': np.uint8,       # Card points in the declarer's hand
+    'declarer_points': np.uint8,   # Card points taken by the declarer, skat included
+    'declarer_tricks': np.uint8,
+    'won': np.bool_,
+}
+META_FILE = 'meta.json'
+INITIAL_CAPACITY = 1 << 16
+
+
+class StatsStore:
+    def __init__(self, path):
+        """Open the store in directory path, creating it if needed."""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            self.count, self.capacity = meta['count'], meta['capacity']
+        else:
+            self.count, self.capacity = 0, INITIAL_CAPACITY
+        self.columns = {}
+        self.pending = []
+        self._map_columns()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _map_columns(self):
+        for name, dtype in COLUMNS.items():
+            size = self.capacity * np.dtype(dtype).itemsize
+            with open(self._column_path(name), 'ab') as column_file:
+                if column_file.tell() < size:
+                    column_file.truncate(size)
+            self.columns[name] = np.memmap(self._column_path(name), dtype=dtype, mode='r+', shape=(self.capacity,))
+
+    def _grow(self, needed):
+        #Double the capacity until needed rows fit, then remap the enlarged files.
+        for column in self.columns.values():
+            column.flush()
+        self.columns.clear()
+        while self.capacity < needed:
+            self.capacity *= 2
+        self._map_columns()
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+    def append(self, **columns):
+        """Append a batch of games given as one equal-length array per column.
+
+        Every column must be given and nothing is written unless the whole batch is valid.
+        """
+        missing = set(COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        columns = {name: np.asarray(values, dtype=COLUMNS[name]) for name, values in columns.items()}
+        sizes = {values.shape for values in columns.values()}
+        if len(sizes) != 1 or len(next(iter(sizes))) != 1:
+            raise ValueError("Columns must be one-dimensional and of equal length.")
+        size = len(columns['won'])
+        self.flush_pending()
+        if self.count + size > self.capacity:
+            self._grow(self.count + size)
+        for name in COLUMNS:
+            self.columns[name][self.count:self.count + size] = columns[name]
+        self.count += size
+        self._write_meta()
+
+    def add_game(self, declarer_hand, skat, game_index, declarer, declarer_points, declarer_tricks,
+                 jack_multiplier=None):
+        """Buffer one finished game; hand and skat are card masks.
+
+        jack_multiplier defaults to compactCards.jack_multiplier of hand and skat together; pass
+        Hand.get_jack_multiplier() when a Hand object is at hand.
+        """
+        twelve = declarer_hand | skat
+        if jack_multiplier is None:
+            jack_multiplier = cc.jack_multiplier(twelve)
+        if game_index == cc.NULL:
+            trumps = 0
+        else:
+            trumps = bin(declarer_hand & cc.FOLLOW_MASKS[game_index][cc.TRUMP]).count('1')
+        self.pending.append((declarer_hand, skat, game_index, declarer, jack_multiplier,
+                             bin(declarer_hand & cc.JACK_MASK).count('1'), trumps, cc.mask_points(declarer_hand),
+                             declarer_points, declarer_tricks,
+                             cc.declarer_wins(game_index, declarer_points, declarer_tricks)))
+        if len(self.pending) >= 4096:
+            self.flush_pending()
+
+    def flush_pending(self):
+        if not self.pending:
+            return
+        rows = list(zip(*self.pending))
+        self.pending = []
+        self.append(**{name: np.asarray(values, dtype=COLUMNS[name]) for name, values in zip(COLUMNS, rows)})
+
+    def _write_meta(self):
+        with open(os.path.join(self.path, META_FILE), 'w') as meta_file:
+            json.dump({'count': self.count, 'capacity': self.capacity,
+                       'columns': {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()}}, meta_file)
+
+    def flush(self):
+        self.flush_pending()
+        for column in self.columns.values():
+            column.flush()
+
+    def close(self):
+        self.flush()
+        self.columns.clear()
+
+    def column(self, name):
+        """Return a read view of one column over the stored games."""
+        self.flush_pending()
+        return self.columns[name][:self.count]
+
+    def where(self, **conditions):
+        """Return a boolean mask of the games matching every condition.
+
+        A condition is a value to compare with, a (low, high) inclusive range, or a callable
+        taking the column array and returning a mask.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            values = self.column(name)
+            if callable(condition):
+                mask &= condition(values)
+            elif isinstance(condition, tuple):
+                mask &= (values >= condition[0]) & (values <= condition[1])
+            else:
+                mask &= values == condition
+        return mask
+
+    def group_by(self, *keys, mask=None, value='won'):
+        """Return {key values: (games, mean of value)} for each group of the given columns.
+
+        Groups are counted with np.bincount over a combined integer key, so the cost is a few
+        passes over the selected columns regardless of the number of groups.
+        """
+        key_columns = [self.column(name).astype(np.int64) for name in keys]
+        values = self.column(value).astype(np.float64)
+        if mask is not None:
+            key_columns = [column[mask] for column in key_columns]
+            values = values[mask]
+        if not len(values):
+            return {}
+        sizes = [int(column.max()) + 1 for column in key_columns]
+        combined = np.ravel_multi_index(key_columns, sizes) if key_columns else np.zeros(len(values), dtype=np.int64)
+        games = np.bincount(combined, minlength=int(np.prod(sizes)))
+        totals = np.bincount(combined, weights=values, minlength=int(np.prod(sizes)))
+        result = {}
+        for flat in np.flatnonzero(games):
+            group = tuple(int(index) for index in np.unravel_index(flat, sizes)) if key_columns else ()
+            result[group] = (int(games[flat]), float(totals[flat] / games[flat]))
+        return result
+
+    def win_rate_by_game_type(self, mask=None):
+        """Return {game type name: (games, win rate)}."""
+        return {cc.GAME_TYPES[game_index]: stats
+                for (game_index,), stats in self.group_by('game_type', mask=mask).items()}
@@ -1,56 +1,88 @@
 import logging
 from typing import List, Optional, Any
 
+logger = logging.getLogger(__name__)
+
+
 class Trick:
+    __slots__ = ('trick_forehand', 'moves', 'count', 'card_values', 'winner_index', 'trick_winner')
+
     def __init__(self, trick_forehand: 'Player'):
         self.trick_forehand = trick_forehand
-        self.cards: List['Move'] = []
+        self.moves: List[Optional['Move']] = [None, None, None]
+        self.count: int = 0
         self.card_values: int = 0
+        self.winner_index: int = 0
         self.trick_winner: Optional['Player'] = None
-        self.logger = logging.getLogger(__name__)
+
+    @property
+    def cards(self) -> List['Move']:
+        # A new list on every access, for logging and debugging; mutating it does not change the
+        # trick. Hot paths should use count and move_at() instead.
+        return self.moves[:self.count]
+
+    def move_at(self, index: int) -> 'Move':
+        if not 0 <= index < self.count:
+            raise IndexError(f"No move at position {index}; the trick holds {self.count}.")
+        return self.moves[index]
 
     @property
     def leading_card(self) -> Optional['Card']:
-        return self.cards[0].card if self.cards else None
+        return self.moves[0].card if self.count else None
 
     @property
     def is_finished(self) -> bool:
-        return len(self.cards) == 3
+        return self.count == 3
+
+    @property
+    def current_winner(self) -> Optional['Player']:
+        return self.moves[self.winner_index].player if self.count else None
 
     def add_move(self, move: 'Move') -> None:
-        if self.is_finished:
+        if self.count == 3:
             raise ValueError("Cannot add move; trick is already completed.")
 
-        self.cards.append(move)
+        moves = self.moves
+        index = self.count
+        moves[index] = move
+        self.count = index + 1
         self.card_values += move.card.value
+        # The winner is kept up to date as cards arrive, so no pass over the trick is needed.
+        if index and move.card.beats(moves[self.winner_index].card):
+            self.winner_index = index
 
-        self.logger.debug(f"Move added: {move}. Current trick state: {self.cards}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Move added: {move}. Current trick state: {self.cards}")
 
-        if self.is_finished:
-            self.determine_winner()
-            self.logger.info(
-                f"Trick finished: cards {self.cards}, trick winner {self.trick_winner}, total value {self.card_values}"
-            )
+        if index == 2:
+            self.trick_winner = moves[self.winner_index].player
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    f"Trick finished: cards {self.cards}, trick winner {self.trick_winner}, "
+                    f"total value {self.card_values}"
+                )
 
     def determine_winner(self) -> None:
-        self.trick_winner = self.trick_forehand
-        for i in range(1, len(self.cards)):
-            if self.cards[i].card.beats(self.cards[self.cards.index(self.trick_winner)].card):
-                self.trick_winner = self.cards[i].player
-
-        self.logger.debug(f"Winner determined: {self.trick_winner}")
+        self.trick_winner = self.current_winner
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Winner determined: {self.trick_winner}")
 
     def get_card_value_summary(self) -> str:
         return f"Total card value: {self.card_values}"
 
-    def copy(self) -> 'Trick':
-        trick_copy = Trick(self.trick_forehand)
-        trick_copy.cards = self.cards[:]
-        trick_copy.trick_winner = self.trick_winner
-        trick_copy.card_values = self.card_values
-        self.logger.debug(f"Trick copied: {trick_copy}")
+    def copy(self, pool: Optional['TrickPool'] = None) -> 'Trick':
+        trick_copy = pool.acquire(self.trick_forehand) if pool is not None else Trick(self.trick_forehand)
+        self.copy_into(trick_copy)
         return trick_copy
 
+    def copy_into(self, other: 'Trick') -> None:
+        other.trick_forehand = self.trick_forehand
+        other.moves[0], other.moves[1], other.moves[2] = self.moves
+        other.count = self.count
+        other.card_values = self.card_values
+        other.winner_index = self.winner_index
+        other.trick_winner = self.trick_winner
+
     def __repr__(self) -> str:
         return (
             f"Trick(trick_forehand={self.trick_forehand}, "
@@ -63,19 +95,27 @@ class Trick:
             return False
         return (
             self.trick_forehand == other.trick_forehand and
-            self.cards == other.cards and
+            self.count == other.count and
+            self.moves == other.moves and
             self.card_values == other.card_values and
             self.trick_winner == other.trick_winner
         )
 
     def __hash__(self) -> int:
-        return hash((self.trick_forehand, tuple(self.cards), self.card_values, self.trick_winner))
+        return hash((self.trick_forehand, tuple(self.moves), self.card_values, self.trick_winner))
 
-    def reset_trick(self) -> None:
-        self.cards.clear()
+    def reset(self, trick_forehand: 'Player') -> None:
+        # Reuse this trick for a new forehand without allocating.
+        self.trick_forehand = trick_forehand
+        self.moves[0] = self.moves[1] = self.moves[2] = None
+        self.count = 0
         self.card_values = 0
+        self.winner_index = 0
         self.trick_winner = None
-        self.logger.info("Trick has been reset.")
+
+    def reset_trick(self) -> None:
+        self.reset(self.trick_forehand)
+        logger.info("Trick has been reset.")
 
     def get_trick_summary(self) -> str:
         card_strs = [f"{move.card} (Player: {move.player})" for move in self.cards]
@@ -87,3 +127,23 @@ class Trick:
             f"Trick winner: {self.trick_winner}\n"
         )
         return summary
+
+
+class TrickPool:
+    __slots__ = ('free',)
+
+    def __init__(self, size: int = 0):
+        self.free: List[Trick] = [Trick(None) for _ in range(size)]
+
+    def acquire(self, trick_forehand: 'Player') -> Trick:
+        if self.free:
+            trick = self.free.pop()
+            trick.reset(trick_forehand)
+            return trick
+        return Trick(trick_forehand)
+
+    def release(self, trick: Trick) -> None:
+        self.free.append(trick)
+
+    def __len__(self) -> int:
+        return len(self.free)
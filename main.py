@@ -1,6 +1,7 @@
 import os
 import sys
 import pygame
+from common.constants import FPS
 from game.skat.cardDeck import Deck
 
 # Initialize Pygame
@@ -25,6 +26,7 @@ TABLE_CENTER = (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
 # Initialize display and font
 screen = pygame.display.set_mode(WINDOW_SIZE)
 pygame.display.set_caption("Skat Card Game")
+clock = pygame.time.Clock()
 font = pygame.font.SysFont("timesnewroman", 13, bold=True)
 
 # Player names and initial scores
@@ -144,26 +146,41 @@ def handle_card_click(pos):
             break
 
 
+def handle_events(events):
+    # Returns False once the window is closed.
+    running = True
+    for event in events:
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            handle_card_click(event.pos)
+    return running
+
+
+def draw_frame():
+    draw_background()
+    draw_players()
+    draw_player_cards()
+    draw_table_cards()
+
+
 # Main game loop
-def main():
+def main(recorder=None):
     try:
         running = True
         while running:
             # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    handle_card_click(event.pos)
+            events = pygame.event.get()
+            running = handle_events(events)
 
             # Drawing sequence
-            draw_background()
-            draw_players()
-            draw_player_cards()
-            draw_table_cards()
+            draw_frame()
 
             # Update display
             pygame.display.flip()
+            if recorder is not None:
+                recorder.capture(events)
+            clock.tick(FPS)
 
     except KeyboardInterrupt:
         print("Program terminated by user")
@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from common.constants import Actions
+from server import protocol
+from server.table import Table, choose_ai_move, choose_ai_declaration
+
+AI_DECLARER_SEAT = 1
+
+
+class GameServer:
+    def __init__(self, workers=None, iterations=200, declare_budget=0.1, book_path=None):
+        """Host many concurrent tables in one process; AI search runs in a process pool.
+
+        book_path names an opening book file (see game.skat.openingBook) for the first trick.
+        """
+        # Forked workers would inherit the client sockets open at fork time and keep them
+        # from closing, so start workers from a clean fork server where available.
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+        self.iterations = iterations
+        self.declare_budget = declare_budget
+        self.book_path = book_path
+        self.tables = {}
+        self.connections = 0
+        self.logger = logging.getLogger(__name__)
+        self.handlers = {
+            Actions.DRAW: self.handle_draw,
+            Actions.BID: self.handle_bid,
+            Actions.PASS: self.handle_pass,
+            Actions.DRAW_HIDDEN: self.handle_draw_hidden,
+            Actions.DECLARE_GAME: self.handle_declare_game,
+            Actions.PLAY_CARD: self.handle_play_card,
+            Actions.VIEW_HAND: self.handle_view_hand,
+            Actions.VIEW_TABLE: self.handle_view_table,
+            Actions.VIEW_SCORES: self.handle_view_scores,
+        }
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        #Listen on a Unix socket when path is given, on TCP otherwise.
+        if path:
+            return await asyncio.start_unix_server(self.handle_connection, path=path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        #Serve one client; a connection may own any number of tables.
+        owned = set()
+        tasks = set()
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    action, fields = protocol.decode(line)
+                except ValueError as exc:
+                    writer.write(protocol.error(Actions.ANNOUNCE, f"Malformed message: {exc}"))
+                    continue
+                handler = self.handlers.get(action)
+                table = self.tables.get(fields.get('table'))
+                if handler is None:
+                    writer.write(protocol.error(action, "Unsupported action."))
+                elif action != Actions.DRAW and (table is None or table.id not in owned):
+                    writer.write(protocol.error(action, "Unknown table.", table=fields.get('table')))
+                else:
+                    # Each request runs as its own task so a slow AI turn at one table
+                    # never holds up the other tables on the same connection.
+                    task = asyncio.create_task(self.dispatch(handler, table, fields, writer, owned))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            for table_id in owned:
+                self.tables.pop(table_id, None)
+            self.connections -= 1
+            writer.close()
+
+    async def dispatch(self, handler, table, fields, writer, owned):
+        try:
+            await handler(table, fields, writer, owned)
+        except ValueError as exc:
+            writer.write(protocol.error(Actions.ANNOUNCE, str(exc), table=table.id if table else None))
+        except Exception:
+            self.logger.exception("Request failed")
+            writer.write(protocol.error(Actions.ANNOUNCE, "Internal error.", table=table.id if table else None))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def handle_draw(self, table, fields, writer, owned):
+        #Open a new table and deal the human's hand.
+        table = Table()
+        self.tables[table.id] = table
+        owned.add(table.id)
+        writer.write(protocol.encode(Actions.DRAW, table=table.id, seat=table.human_seat,
+                                     hand=table.hand_cards(table.human_seat), ref=fields.get('ref')))
+
+    async def handle_bid(self, table, fields, writer, owned):
+        #The AI players pass, so any bid makes the human the declarer.
+        self.require_phase(table, Table.Phase.BIDDING)
+        table.set_declarer(table.human_seat)
+        writer.write(protocol.encode(Actions.BID, table=table.id, declarer=table.declarer,
+                                     value=fields.get('value', 18)))
+
+    async def handle_pass(self, table, fields, writer, owned):
+        #The human passes; an AI player takes the game and declares it.
+        self.require_phase(table, Table.Phase.BIDDING)
+        table.set_declarer(AI_DECLARER_SEAT)
+        table.pick_up_skat()
+        loop = asyncio.get_running_loop()
+        discard, game_type = await loop.run_in_executor(
+            self.executor, choose_ai_declaration, table.hand_cards(table.declarer), self.declare_budget,
+            table.declarer, table.leader)
+        table.declare(game_type, discard)
+        writer.write(protocol.encode(Actions.DECLARE_GAME, table=table.id, declarer=table.declarer,
+                                     game_type=game_type))
+        await self.advance(table, writer)
+
+    async def handle_draw_hidden(self, table, fields, writer, owned):
+        #The human declarer picks up the skat.
+        self.require_phase(table, Table.Phase.DECLARING)
+        if table.declarer != table.human_seat or table.skat == 0:
+            raise ValueError("Only the declarer may pick up the skat, and only once.")
+        table.pick_up_skat()
+        writer.write(protocol.encode(Actions.DRAW_HIDDEN, table=table.id, hand=table.hand_cards(table.human_seat)))
+
+    async def handle_declare_game(self, table, fields, writer, owned):
+        self.require_phase(table, Table.Phase.DECLARING)
+        if table.declarer != table.human_seat:
+            raise ValueError("Only the declarer may declare the game.")
+        table.declare(fields.get('game_type'), fields.get('discard', []))
+        writer.write(protocol.encode(Actions.DECLARE_GAME, table=table.id, declarer=table.declarer,
+                                     game_type=fields.get('game_type')))
+        await self.advance(table, writer)
+
+    async def handle_play_card(self, table, fields, writer, owned):
+        self.play(table, table.human_seat, fields.get('card'), writer)
+        await self.advance(table, writer)
+
+    async def handle_view_hand(self, table, fields, writer, owned):
+        legal = table.legal_cards(table.human_seat) if table.phase == Table.Phase.PLAYING else []
+        writer.write(protocol.encode(Actions.VIEW_HAND, table=table.id, hand=table.hand_cards(table.human_seat),
+                                     legal=legal, to_move=table.to_move))
+
+    async def handle_view_table(self, table, fields, writer, owned):
+        writer.write(protocol.encode(Actions.VIEW_TABLE, table=table.id, phase=table.phase,
+                                     trick=table.trick_cards(), leader=table.leader, to_move=table.to_move))
+
+    async def handle_view_scores(self, table, fields, writer, owned):
+        writer.write(self.scores_message(table))
+
+    def play(self, table, seat, card, writer):
+        table.play(seat, card)
+        writer.write(protocol.encode(Actions.PLAY_CARD, table=table.id, seat=seat, card=card))
+
+    async def advance(self, table, writer):
+        #Let the AI seats play until it is the human's turn or the game is over.
+        loop = asyncio.get_running_loop()
+        while table.is_ai_turn():
+            seat = table.to_move
+            card = await loop.run_in_executor(self.executor, choose_ai_move, table.search_state(), self.iterations,
+                                              self.book_path)
+            self.play(table, seat, card, writer)
+        if table.phase == Table.Phase.FINISHED:
+            writer.write(self.scores_message(table))
+        else:
+            await self.handle_view_hand(table, {}, writer, None)
+
+    def scores_message(self, table):
+        declarer_won = table.declarer_won() if table.phase == Table.Phase.FINISHED else None
+        return protocol.encode(Actions.VIEW_SCORES, table=table.id, points=table.card_points(),
+                               declarer=table.declarer, declarer_won=declarer_won)
+
+    @staticmethod
+    def require_phase(table, phase):
+        if table.phase != phase:
+            raise ValueError(f"Table is {table.phase}, expected {phase}.")
+
+
+async def serve(args):
+    game_server = GameServer(workers=args.workers, iterations=args.iterations, book_path=args.book)
+    server = await game_server.start(args.host, args.port, args.unix)
+    logging.getLogger(__name__).info("Serving on %s", args.unix or f"{args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many Skat tables in one process.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="Listen on this Unix socket path instead of TCP.")
+    parser.add_argument('--workers', type=int, default=None, help="AI worker processes (default: CPU count).")
+    parser.add_argument('--iterations', type=int, default=200, help="Random playouts per AI move.")
+    parser.add_argument('--book', help="Opening book file for the first trick.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Server terminated by user")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from common.constants import Actions
+from server import protocol
+from server.gameServer import GameServer
+
+
+class LoadTestConnection:
+    def __init__(self, reader, writer):
+        """One client connection that multiplexes many simulated tables."""
+        self.reader = reader
+        self.writer = writer
+        self.queues = {}  # table id or ("ref", n) -> asyncio.Queue of (action, fields)
+
+    def queue(self, key):
+        if key not in self.queues:
+            self.queues[key] = asyncio.Queue()
+        return self.queues[key]
+
+    def send(self, action, **fields):
+        self.writer.write(protocol.encode(action, **fields))
+
+    async def read_loop(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            action, fields = protocol.decode(line)
+            key = ('ref', fields['ref']) if action == Actions.DRAW else fields.get('table')
+            await self.queue(key).put((action, fields))
+
+
+async def play_table(connection, ref, latencies, rng, bid_rate):
+    #Play one full game as the human seat and record how long each AI reply took.
+    connection.send(Actions.DRAW, ref=ref)
+    _, fields = await connection.queue(('ref', ref)).get()
+    table, seat = fields['table'], fields['seat']
+    inbox = connection.queue(table)
+
+    sent = time.perf_counter()
+    if rng.random() < bid_rate:
+        connection.send(Actions.BID, table=table, value=18)
+        await inbox.get()
+        connection.send(Actions.DRAW_HIDDEN, table=table)
+        _, fields = await inbox.get()
+        sent = time.perf_counter()
+        connection.send(Actions.DECLARE_GAME, table=table, game_type='Grand',
+                        discard=rng.sample(fields['hand'], 2))
+    else:
+        connection.send(Actions.PASS, table=table)
+
+    while True:
+        action, fields = await inbox.get()
+        if 'error' in fields:
+            raise RuntimeError(f"Table {table}: {fields['error']}")
+        if action == Actions.VIEW_SCORES:
+            latencies.append(time.perf_counter() - sent)
+            return fields['declarer_won']
+        if action == Actions.VIEW_HAND and fields['to_move'] == seat:
+            latencies.append(time.perf_counter() - sent)
+            sent = time.perf_counter()
+            connection.send(Actions.PLAY_CARD, table=table, card=rng.choice(fields['legal']))
+
+
+async def run_load_test(args):
+    game_server = None
+    if not args.connect:
+        game_server = GameServer(workers=args.workers, iterations=args.iterations)
+        server = await game_server.start(args.host, args.port, args.unix)
+    if args.unix:
+        streams = [await asyncio.open_unix_connection(args.unix) for _ in range(args.connections)]
+    else:
+        streams = [await asyncio.open_connection(args.host, args.port) for _ in range(args.connections)]
+    connections = [LoadTestConnection(reader, writer) for reader, writer in streams]
+    readers = [asyncio.create_task(connection.read_loop()) for connection in connections]
+
+    rng = random.Random(args.seed)
+    latencies = []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        play_table(connections[ref % len(connections)], ref, latencies, rng, args.bid_rate)
+        for ref in range(args.tables)
+    ))
+    elapsed = time.perf_counter() - started
+
+    for task in readers:
+        task.cancel()
+    for connection in connections:
+        connection.writer.close()
+        await connection.writer.wait_closed()
+    if game_server:
+        while game_server.connections:
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        game_server.close()
+    report(args.tables, results, latencies, elapsed)
+
+
+def report(tables, results, latencies, elapsed):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"Tables: {tables} in {elapsed:.2f}s ({tables / elapsed:.1f} games/s)")
+    print(f"Declarer won: {sum(1 for won in results if won)}/{tables}")
+    print(f"Move latency over {len(latencies)} replies (ms): "
+          f"mean {statistics.fmean(latencies) * 1000:.1f}  p50 {quantiles[49] * 1000:.1f}  "
+          f"p95 {quantiles[94] * 1000:.1f}  p99 {quantiles[98] * 1000:.1f}  max {latencies[-1] * 1000:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many concurrent tables against the game server.")
+    parser.add_argument('--tables', type=int, default=300)
+    parser.add_argument('--connections', type=int, default=10)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="Use this Unix socket path instead of TCP.")
+    parser.add_argument('--connect', action='store_true', help="Use a running server instead of starting one.")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--iterations', type=int, default=50, help="Random playouts per AI move.")
+    parser.add_argument('--bid-rate', type=float, default=0.5, help="Share of tables where the client declares.")
+    parser.add_argument('--seed', type=int, default=None)
+    asyncio.run(run_load_test(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
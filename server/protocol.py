@@ -0,0 +1,34 @@
+import json
+from common.constants import Actions
+
+# Newline delimited JSON messages. Every message carries the value of an Actions member
+# under "action"; replies to a rejected request carry an "error" text as well.
+
+
+def encode(action, **fields):
+    """Encode a message for the wire."""
+    fields['action'] = action.value
+    return (json.dumps(fields, separators=(',', ':')) + '\n').encode()
+
+
+def decode(line):
+    """Decode one line from the wire into (Actions member, fields).
+
+    Raises ValueError for anything but a JSON object with a known action and, when present,
+    an integer table id.
+    """
+    fields = json.loads(line)
+    if not isinstance(fields, dict):
+        raise ValueError("A message must be a JSON object.")
+    if 'action' not in fields:
+        raise ValueError("A message must carry an action.")
+    action = Actions(fields.pop('action'))
+    table = fields.get('table')
+    if table is not None and (not isinstance(table, int) or isinstance(table, bool)):
+        raise ValueError("The table must be an integer id.")
+    return action, fields
+
+
+def error(action, message, **fields):
+    """Encode a rejection of a request."""
+    return encode(action, error=message, **fields)
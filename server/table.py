@@ -0,0 +1,163 @@
+import random
+from itertools import count
+
+from game.skat import compactCards as cc, stateCodec
+from game.skat.declarerOptimizer import DeclarerOptimizer
+from game.skat.openingBook import OpeningBook
+
+
+class Table:
+    _ids = count(1)
+
+    class Phase:
+        BIDDING = 'bidding'
+        DECLARING = 'declaring'
+        PLAYING = 'playing'
+        FINISHED = 'finished'
+
+    def __init__(self, human_seat=0, rng=random):
+        """A single Skat table with one human seat; the other seats are played by the AI."""
+        self.id = next(Table._ids)
+        self.human_seat = human_seat
+        deck = list(range(cc.NUM_CARDS))
+        rng.shuffle(deck)
+        self.hands = [sum(1 << card for card in deck[seat * 10:seat * 10 + 10]) for seat in range(3)]
+        self.skat = sum(1 << card for card in deck[30:])
+        self.phase = Table.Phase.BIDDING
+        self.declarer = None
+        self.game_index = None
+        self.leader = 0
+        self.to_move = 0
+        self.trick = []
+        self.points = [0, 0, 0]
+        self.tricks = [0, 0, 0]
+
+    def hand_cards(self, seat):
+        return cc.mask_to_cards(self.hands[seat])
+
+    def trick_cards(self):
+        return [cc.CARD_NAMES[card] for card in self.trick]
+
+    def legal_cards(self, seat):
+        lead_card = self.trick[0] if self.trick else None
+        return cc.mask_to_cards(cc.legal_mask(self.game_index, self.hands[seat], lead_card))
+
+    def is_ai_turn(self):
+        return self.phase == Table.Phase.PLAYING and self.to_move != self.human_seat
+
+    def set_declarer(self, seat):
+        self.declarer = seat
+        self.phase = Table.Phase.DECLARING
+
+    def pick_up_skat(self):
+        #Move the skat into the declarer's hand.
+        self.hands[self.declarer] |= self.skat
+        self.skat = 0
+
+    def declare(self, game_type, discard):
+        #Discard two cards (when the skat was picked up) and start the card play.
+        if game_type not in cc.GAME_TYPES:
+            raise ValueError(f"Unknown game type: {game_type}")
+        if not isinstance(discard, list) or not all(isinstance(card, str) and card in cc.CARD_INDEX for card in discard):
+            raise ValueError(f"Unknown cards in discard: {discard}")
+        discard_mask = cc.cards_to_mask(discard)
+        if self.skat == 0:
+            if bin(discard_mask).count('1') != 2 or discard_mask & ~self.hands[self.declarer]:
+                raise ValueError("The declarer must discard two cards from the hand.")
+            self.hands[self.declarer] ^= discard_mask
+            self.skat = discard_mask
+        self.game_index = cc.GAME_TYPE_INDEX[game_type]
+        self.phase = Table.Phase.PLAYING
+
+    def play(self, seat, card):
+        #Play a card for seat; return the seat that won the trick if it was completed.
+        if self.phase != Table.Phase.PLAYING or seat != self.to_move:
+            raise ValueError("It is not this seat's turn.")
+        index = cc.CARD_INDEX.get(card) if isinstance(card, str) else None
+        if index is None or card not in self.legal_cards(seat):
+            raise ValueError(f"Illegal card: {card}")
+        self.hands[seat] ^= 1 << index
+        self.trick.append(index)
+        self.to_move = (seat + 1) % 3
+        if len(self.trick) < 3:
+            return None
+        winner = (self.leader + cc.trick_winner(self.game_index, self.trick)) % 3
+        self.points[winner] += sum(cc.CARD_POINTS[trick_card] for trick_card in self.trick)
+        self.tricks[winner] += 1
+        self.trick = []
+        self.leader = self.to_move = winner
+        if not any(self.hands):
+            self.phase = Table.Phase.FINISHED
+        return winner
+
+    def card_points(self):
+        #Points per seat, with the skat counted for the declarer outside Null games.
+        points = list(self.points)
+        if self.game_index is not None and self.game_index != cc.NULL:
+            points[self.declarer] += cc.mask_points(self.skat)
+        return points
+
+    def declarer_won(self):
+        return cc.declarer_wins(self.game_index, self.card_points()[self.declarer], self.tricks[self.declarer])
+
+    def search_state(self):
+        #The 32 byte encoding handed to choose_ai_move.
+        return stateCodec.encode(stateCodec.GameStateRecord(
+            tuple(self.hands), self.skat, tuple(self.trick), self.leader, self.to_move, self.declarer,
+            self.game_index, tuple(self.points), tuple(self.tricks)))
+
+
+# Worker functions. They run in a process pool, so they only take and return plain values.
+
+_books = {}
+
+
+def _open_book(path):
+    #Each worker process maps a book once and keeps it for later moves.
+    book = _books.get(path)
+    if book is None:
+        book = _books[path] = OpeningBook(path)
+    return book
+
+
+def choose_ai_move(encoded_state, iterations=200, book_path=None, rng=random):
+    """Return the card to play in an encoded table position.
+
+    The first trick is looked up in the opening book at book_path when one is given.
+    Otherwise every legal card gets an equal share of iterations random playouts, counted
+    from the side of the seat to move: declarer wins for the declarer, declarer losses for a defender.
+    """
+    record = stateCodec.decode(encoded_state)
+    game_index, seat, declarer = record.game_index, record.to_move, record.declarer
+    lead_card = record.trick[0] if record.trick else None
+    legal = list(cc.iter_bits(cc.legal_mask(game_index, record.hands[seat], lead_card)))
+    if len(legal) == 1:
+        return cc.CARD_NAMES[legal[0]]
+    if book_path is not None and not any(record.tricks) and len(record.trick) <= 1:
+        card = _open_book(book_path).lookup(game_index, record.hands[seat], (declarer - seat) % 3, lead_card)
+        if card in legal:
+            return cc.CARD_NAMES[card]
+    # Start from what the declarer has already taken, the skat included outside Null.
+    points = record.points[declarer] + (cc.mask_points(record.skat) if game_index != cc.NULL else 0)
+    tricks = record.tricks[declarer]
+    playouts = max(1, iterations // len(legal))
+    best_card, best_score = legal[0], -1
+    for card in legal:
+        hands = list(record.hands)
+        hands[seat] ^= 1 << card
+        wins = 0
+        for _ in range(playouts):
+            won_points, won_tricks = cc.random_playout(game_index, hands, record.leader, declarer, rng,
+                                                       record.trick + (card,))
+            wins += cc.declarer_wins(game_index, points + won_points, tricks + won_tricks)
+        score = wins if seat == declarer else playouts - wins
+        if score > best_score:
+            best_card, best_score = card, score
+    return cc.CARD_NAMES[best_card]
+
+
+def choose_ai_declaration(cards, budget=0.1, declarer=0, forehand=0, bid=18):
+    """Return (discard, game type) for an AI declarer holding twelve cards."""
+    decision = DeclarerOptimizer(budget=budget).choose(cards, budget=budget, bid=bid, declarer=declarer,
+                                                       forehand=forehand)
+    return decision.discard, decision.game_type
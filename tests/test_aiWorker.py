@@ -0,0 +1,86 @@
+import random
+import time
+from copy import deepcopy
+
+import pytest
+
+from game.skat import compactCards as cc
+from game.skat.aiWorker import AIWorker
+from game.skat.mcts import SkatGameState, order_moves
+
+
+def dealt_state(seed=0, game_index=cc.GRAND):
+    deck = list(range(cc.NUM_CARDS))
+    random.Random(seed).shuffle(deck)
+    cards_in_hand = {seat: cc.mask_to_cards(sum(1 << card for card in deck[seat * 10:seat * 10 + 10]))
+                     for seat in range(3)}
+    trump_suit = cc.SUIT_NAMES[game_index] if game_index < cc.GRAND else None
+    return SkatGameState(0, cards_in_hand, [], [0, 0, 0], trump_suit, cc.GAME_TYPES[game_index])
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "the worker did not get there in time"
+        time.sleep(0.005)
+
+
+def test_ponder_then_human_move_reuses_the_tree():
+    worker = AIWorker(progress_every=10)
+    state = dealt_state()
+    worker.ponder(state)
+    assert worker.pondering
+    wait_until(lambda: worker.root.visits >= 200 and worker.root.children)
+    worker.cancel()
+    # The human plays the move the ponder search looked at most.
+    pondered = max(worker.root.children, key=lambda child: child.visits)
+    human_move, visits = pondered.state.last_move, pondered.visits
+
+    worker.notify_move(human_move)
+    assert worker.root is pondered and worker.root.parent is None
+    next_state = deepcopy(state)
+    next_state.perform_move(human_move)
+    worker.start_search(next_state, time_budget=0)
+    assert not worker.pondering
+    wait_until(lambda: not worker.is_thinking)
+    # A zero budget adds nothing, so the answer comes from the statistics gathered while pondering.
+    assert worker.root is pondered and worker.root.visits == visits
+    expected = pondered.best_child(0).state.last_move if pondered.children else pondered.untried_actions[-1]
+    move = worker.poll()
+    assert move == expected
+    assert move in next_state.get_legal_moves()
+    assert worker.root.state.last_move == move
+
+
+def test_zero_budget_returns_the_heuristic_pick():
+    worker = AIWorker()
+    state = dealt_state(seed=1)
+    worker.start_search(state, time_budget=0)
+    wait_until(lambda: not worker.is_thinking)
+    assert worker.root.visits == 0
+    ordered, _ = order_moves(state, state.get_legal_moves())
+    assert worker.poll() == ordered[-1]
+
+
+def test_cancel_during_pondering_stops_the_thread_and_keeps_the_tree():
+    worker = AIWorker(progress_every=10)
+    worker.ponder(dealt_state(seed=2))
+    wait_until(lambda: worker.root.visits >= 50)
+    assert worker.is_thinking
+    worker.cancel()
+    assert not worker.is_thinking and worker.thread is None
+    visits = worker.root.visits
+    assert visits >= 50
+    time.sleep(0.05)
+    assert worker.root.visits == visits
+    # Pondering never produces a move to play.
+    assert worker.result is None and worker.poll() is None
+
+
+def test_start_search_raises_on_a_terminal_state():
+    state = SkatGameState(0, {0: [], 1: [], 2: []}, [], [40, 40, 40], None, cc.GAME_TYPES[cc.GRAND])
+    assert state.is_terminal()
+    worker = AIWorker()
+    with pytest.raises(ValueError):
+        worker.start_search(state)
+    assert not worker.is_thinking and worker.root is None
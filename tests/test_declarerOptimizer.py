@@ -0,0 +1,24 @@
+import random
+import time
+
+from game.skat import compactCards as cc
+from game.skat.declarerOptimizer import DeclarerOptimizer
+
+
+def test_choose_returns_within_budget():
+    rng = random.Random(0)
+    for budget in (0.005, 0.02):
+        for _ in range(5):
+            cards = rng.sample(cc.CARD_NAMES, 12)
+            started = time.perf_counter()
+            decision = DeclarerOptimizer(rng=random.Random(1)).choose(cards, budget=budget)
+            assert time.perf_counter() - started < budget + 0.01
+            assert len(decision.discard) == 2 and set(decision.discard) <= set(cards)
+
+
+def test_four_jacks_and_aces_declare_grand():
+    cards = ['clubs-jack', 'spades-jack', 'hearts-jack', 'diamonds-jack', 'clubs-ace', 'clubs-10',
+             'spades-ace', 'spades-10', 'hearts-ace', 'hearts-10', 'diamonds-7', 'diamonds-8']
+    decision = DeclarerOptimizer(rng=random.Random(2)).choose(cards, budget=0.1)
+    assert decision.game_type == 'Grand'
+    assert decision.expected_value > 100
@@ -0,0 +1,43 @@
+import random
+
+from game.skat import compactCards as cc
+from game.skat.mcts import SkatGameState, heuristic_score
+
+
+def state_for(game_index, hands, leader=0):
+    trump_suit = cc.SUIT_NAMES[game_index] if game_index < cc.GRAND else None
+    cards_in_hand = {player: cc.mask_to_cards(hands[player]) for player in range(3)}
+    return SkatGameState(leader, cards_in_hand, [], [0, 0, 0], trump_suit, cc.GAME_TYPES[game_index])
+
+
+def test_tricks_follow_the_rules_of_compact_cards():
+    rng = random.Random(0)
+    for _ in range(300):
+        game_index = rng.randrange(len(cc.GAME_TYPES))
+        deck = list(range(cc.NUM_CARDS))
+        rng.shuffle(deck)
+        hands = [sum(1 << card for card in deck[seat * 10:seat * 10 + 10]) for seat in range(3)]
+        leader = rng.randrange(3)
+        state = state_for(game_index, hands, leader)
+        while not state.is_terminal():
+            trick = [cc.CARD_INDEX[card] for card in state.trick_cards]
+            lead_card = trick[0] if trick else None
+            legal = cc.mask_to_cards(cc.legal_mask(game_index, hands[state.current_player], lead_card))
+            assert sorted(state.get_legal_moves()) == sorted(legal)
+            card = rng.choice(legal)
+            hands[state.current_player] ^= 1 << cc.CARD_INDEX[card]
+            trick.append(cc.CARD_INDEX[card])
+            state.perform_move(card)
+            if len(trick) == 3:
+                assert state.current_player == (leader + cc.trick_winner(game_index, trick)) % 3
+                leader = state.current_player
+
+
+def test_heuristic_prefers_the_card_that_wins_the_trick():
+    # Grand: the spade jack beats the led ace of hearts, the heart ten does not.
+    hands = [cc.cards_to_mask(['hearts-ace']), cc.cards_to_mask(['spades-jack', 'hearts-10']), 0]
+    state = state_for(cc.GRAND, hands)
+    state.perform_move('hearts-ace')
+    assert state.get_legal_moves() == ['hearts-10']
+    state.cards_in_hand[1] = ['spades-jack', 'clubs-7']  # Void in hearts: any card may be played
+    assert heuristic_score(state, 'spades-jack') > heuristic_score(state, 'clubs-7')
@@ -0,0 +1,69 @@
+import random
+
+from game.skat import compactCards as cc, openingBook
+from game.skat.gameType import GameType
+from game.skat.mcts import SkatGameState
+
+
+def random_position(rng):
+    deck = list(range(cc.NUM_CARDS))
+    rng.shuffle(deck)
+    hand = sum(1 << card for card in deck[:10])
+    lead_card = deck[10] if rng.random() < 0.5 else None
+    return hand, rng.randrange(3), lead_card
+
+
+def test_write_and_lookup_round_trip(tmp_path):
+    rng = random.Random(0)
+    positions = [random_position(rng) for _ in range(50)]
+    entries = {}
+    for hand, declarer_offset, lead_card in positions:
+        key, slots = openingBook.position_key(cc.GRAND, hand, declarer_offset, lead_card)
+        entries[key] = (min(openingBook.position_moves(cc.GRAND, hand, lead_card, slots)), 10, 0.5)
+    path = str(tmp_path / 'book.bin')
+    openingBook.write_book(path, entries)
+    book = openingBook.OpeningBook(path)
+    try:
+        assert len(book) == len(entries)
+        for hand, declarer_offset, lead_card in positions:
+            key, slots = openingBook.position_key(cc.GRAND, hand, declarer_offset, lead_card)
+            expected = openingBook.move_card(cc.GRAND, hand, lead_card, slots, entries[key][0])
+            assert book.lookup(cc.GRAND, hand, declarer_offset, lead_card) == expected
+        assert book.lookup(cc.NULL, *positions[0]) is None
+    finally:
+        book.close()
+
+
+def test_small_book_covers_fresh_deals(tmp_path):
+    path = str(tmp_path / 'book.bin')
+    openingBook.build_book(path, positions=2000, playouts=1, seed=1, game_types=[GameType.GRAND])
+    book = openingBook.OpeningBook(path)
+    rng = random.Random(2)
+    hits = 0
+    try:
+        for _ in range(1000):
+            hand, declarer_offset, lead_card = random_position(rng)
+            card = book.lookup(cc.GRAND, hand, declarer_offset, lead_card)
+            if card is not None:
+                hits += 1
+                assert card in cc.iter_bits(cc.legal_mask(cc.GRAND, hand, lead_card))
+    finally:
+        book.close()
+    assert hits >= 300
+
+
+def test_lookup_state_needs_a_known_game_type(tmp_path):
+    rng = random.Random(3)
+    hand, _, _ = random_position(rng)
+    key, slots = openingBook.position_key(cc.GRAND, hand, 0)
+    path = str(tmp_path / 'book.bin')
+    openingBook.write_book(path, {key: (1, 10, 0.5)})
+    book = openingBook.OpeningBook(path)
+    try:
+        cards_in_hand = {0: cc.mask_to_cards(hand), 1: [], 2: []}
+        grand = SkatGameState(0, cards_in_hand, [], [0, 0, 0], None, GameType.GRAND)
+        unknown = SkatGameState(0, cards_in_hand, [], [0, 0, 0], None)
+        assert book.lookup_state(grand) == cc.CARD_NAMES[openingBook.move_card(cc.GRAND, hand, None, slots, 1)]
+        assert book.lookup_state(unknown) is None
+    finally:
+        book.close()
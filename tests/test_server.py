@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from common.constants import Actions
+from game.skat import compactCards as cc
+from server import protocol
+from server.table import Table, choose_ai_move
+
+
+@pytest.mark.parametrize('line', [
+    b'not json',
+    b'[1, 2]',
+    b'"draw"',
+    b'{"table": 1}',
+    b'{"action": "no such action"}',
+    b'{"action": "5", "table": [1]}',
+    b'{"action": "5", "table": "1"}',
+    b'{"action": "5", "table": true}',
+])
+def test_decode_rejects_malformed_messages(line):
+    with pytest.raises(ValueError):
+        protocol.decode(line)
+
+
+def test_encode_decode_round_trip():
+    action, fields = protocol.decode(protocol.encode(Actions.PLAY_CARD, table=3, card='clubs-ace'))
+    assert action == Actions.PLAY_CARD
+    assert fields == {'table': 3, 'card': 'clubs-ace'}
+    assert json.loads(protocol.error(Actions.BID, "No.", table=3)) == {'action': Actions.BID.value, 'error': "No.",
+                                                                        'table': 3}
+
+
+def dealt_table(hands, skat, game_type='Grand', declarer=0):
+    #A table in play with the given hands and skat, lists of card names.
+    table = Table()
+    table.hands = [cc.cards_to_mask(hand) for hand in hands]
+    table.skat = cc.cards_to_mask(skat)
+    table.set_declarer(declarer)
+    table.declare(game_type, [])
+    return table
+
+
+def test_play_enforces_turn_and_following_suit():
+    table = dealt_table([['hearts-ace', 'clubs-7'], ['spades-jack', 'hearts-10'], ['hearts-7', 'clubs-8']],
+                        ['diamonds-7', 'diamonds-8'])
+    with pytest.raises(ValueError):
+        table.play(1, 'hearts-10')  # Not seat 1's turn
+    with pytest.raises(ValueError):
+        table.play(0, 'spades-ace')  # Not in the hand
+    table.play(0, 'hearts-ace')
+    # The spade jack is a trump in Grand, so it does not follow hearts.
+    assert table.legal_cards(1) == ['hearts-10']
+    with pytest.raises(ValueError):
+        table.play(1, 'spades-jack')
+
+
+def test_trick_scoring_and_card_points():
+    table = dealt_table([['hearts-ace', 'clubs-7'], ['spades-jack', 'hearts-10'], ['hearts-7', 'clubs-8']],
+                        ['diamonds-10', 'diamonds-ace'], declarer=1)
+    assert table.play(0, 'hearts-ace') is None
+    table.play(1, 'hearts-10')
+    assert table.play(2, 'hearts-7') == 0
+    assert table.points == [21, 0, 0] and table.tricks == [1, 0, 0]
+    assert (table.leader, table.to_move) == (0, 0)
+    # The skat counts for the declarer in card_points, not in the trick points.
+    assert table.card_points() == [21, 21, 0]
+    table.play(0, 'clubs-7')
+    table.play(1, 'spades-jack')
+    assert table.play(2, 'clubs-8') == 1
+    assert table.phase == Table.Phase.FINISHED
+    assert table.card_points() == [21, 23, 0]
+    assert not table.declarer_won()
+
+
+def test_null_card_points_leave_out_the_skat():
+    table = dealt_table([['hearts-ace'], ['hearts-7'], ['hearts-8']], ['diamonds-10', 'diamonds-ace'], 'Null')
+    assert table.card_points() == [0, 0, 0]
+
+
+def test_choose_ai_move_returns_a_legal_card():
+    table = dealt_table([['hearts-ace', 'clubs-7', 'clubs-ace'], ['spades-jack', 'hearts-10', 'clubs-10'],
+                         ['hearts-7', 'clubs-8', 'clubs-9']], ['diamonds-7', 'diamonds-8'])
+    table.play(0, 'hearts-ace')
+    assert choose_ai_move(table.search_state(), 30) == 'hearts-10'  # The only legal card
+    table.play(1, 'hearts-10')
+    assert choose_ai_move(table.search_state(), 30) == 'hearts-7'
+
+
+def test_defender_plays_against_the_declarer():
+    from game.skat import stateCodec
+    # Grand, the declarer (seat 0) has 50 points and leads the heart ace: trumping with the
+    # club jack is the only way for seat 2 to keep the declarer below 61.
+    hands = (cc.cards_to_mask(['spades-7']), cc.cards_to_mask(['spades-8']),
+             cc.cards_to_mask(['clubs-jack', 'diamonds-7']))
+    trick = (cc.CARD_INDEX['hearts-ace'], cc.CARD_INDEX['hearts-7'])
+    record = stateCodec.GameStateRecord(hands, cc.cards_to_mask(['diamonds-8', 'diamonds-9']), trick, 0, 2, 0,
+                                        cc.GRAND, (50, 50, 0), (4, 4, 0))
+    assert choose_ai_move(stateCodec.encode(record), 20) == 'clubs-jack'
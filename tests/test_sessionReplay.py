@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+pytest.importorskip('pygame')
+
+from game import sessionReplay
+
+
+def test_scripted_session_replays_without_divergence(tmp_path):
+    path = str(tmp_path / 'session.jsonl')
+    sessionReplay.script_session(path, frames=60, click_every=3, seed=1)
+    header, frames = sessionReplay.load_session(path)
+    assert all(frame['state'] is not None for frame in frames)
+    # Every click selects a card or clears the selection, so the recorded states do change.
+    assert len({frame['state']['selected_card_index'] for frame in frames}) > 2
+    assert sessionReplay.replay(path)['divergent_frames'] == 0
+
+
+def test_replay_reports_a_diverging_state(tmp_path):
+    path = str(tmp_path / 'session.jsonl')
+    sessionReplay.script_session(path, frames=30, click_every=3, seed=2)
+    with open(path) as session_file:
+        lines = session_file.readlines()
+    frame = json.loads(lines[-1])
+    frame['state']['selected_card_index'] = 99
+    lines[-1] = json.dumps(frame) + '\n'
+    with open(path, 'w') as session_file:
+        session_file.writelines(lines)
+    assert sessionReplay.replay(path)['divergent_frames'] == 1
@@ -0,0 +1,97 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from game.skat import compactCards as cc, stateCodec
+from game.skat.stateCodec import GameStateRecord, StateBatch
+
+
+def random_record(rng, played=None):
+    #A position in mid play: some tricks taken, then zero to two cards on the current trick.
+    deck = list(range(cc.NUM_CARDS))
+    rng.shuffle(deck)
+    rounds = rng.randrange(10)
+    played = rng.randrange(3) if played is None else played
+    leader = rng.randrange(3)
+    hands = [sum(1 << card for card in deck[seat * 10 + rounds:seat * 10 + 10]) for seat in range(3)]
+    trick = []
+    for offset in range(played):
+        card = next(cc.iter_bits(hands[(leader + offset) % 3]))
+        hands[(leader + offset) % 3] ^= 1 << card
+        trick.append(card)
+    tricks = [0, 0, 0]
+    for _ in range(rounds):
+        tricks[rng.randrange(3)] += 1
+    points = tuple(rng.randrange(40) if count else 0 for count in tricks)
+    return GameStateRecord(tuple(hands), sum(1 << card for card in deck[30:]), tuple(trick), leader,
+                           (leader + played) % 3, rng.randrange(3), rng.randrange(len(cc.GAME_TYPES)),
+                           points, tuple(tricks))
+
+
+def test_encode_decode_round_trip():
+    rng = random.Random(0)
+    for _ in range(200):
+        record = random_record(rng)
+        encoded = stateCodec.encode(record)
+        assert len(encoded) == stateCodec.RECORD.size == 32
+        assert stateCodec.decode(encoded) == record
+
+
+def test_skat_game_state_round_trip():
+    rng = random.Random(1)
+    for _ in range(200):
+        record = random_record(rng)
+        state = stateCodec.to_skat_game_state(record)
+        assert stateCodec.from_skat_game_state(state, declarer=record.declarer) == record
+
+
+def test_skat_game_state_puts_the_declarer_first():
+    record = random_record(random.Random(2))._replace(declarer=2, game_index=cc.GRAND)
+    state = stateCodec.to_skat_game_state(record)
+    assert state.cards_in_hand[0] == cc.mask_to_cards(record.hands[2])
+    assert state.score[0] == record.points[2]
+    assert len(state.tricks_won[0]) == record.tricks[2]
+    assert state.skat == cc.mask_to_cards(record.skat)
+
+
+def test_from_skat_game_state_finds_the_skat():
+    from game.skat.mcts import SkatGameState
+    rng = random.Random(3)
+    deck = list(range(cc.NUM_CARDS))
+    rng.shuffle(deck)
+    hands = {player: [cc.CARD_NAMES[card] for card in deck[player * 10:player * 10 + 10]] for player in range(3)}
+    state = SkatGameState(0, hands, [], [0, 0, 0], 'clubs')
+    for _ in range(4):
+        state.perform_move(state.get_legal_moves()[0])
+    record = stateCodec.from_skat_game_state(state)
+    assert record.skat == sum(1 << card for card in deck[30:])
+    assert sum(record.tricks) == 1 and len(record.trick) == 1
+
+
+def test_state_batch_round_trip():
+    rng = random.Random(4)
+    records = [random_record(rng) for _ in range(50)]
+    with StateBatch(len(records)) as batch:
+        for record in records:
+            batch.append(record)
+        attached = StateBatch(name=batch.name)
+        try:
+            assert len(attached) == len(records)
+            assert [attached[index] for index in range(len(attached))] == records
+            attached[3] = records[0]
+            assert batch[3] == records[0]
+        finally:
+            attached.close()
+        with pytest.raises(IndexError):
+            batch.append(records[0])
+        batch.clear()
+        assert len(batch) == 0
+
+
+def test_map_batch_matches_a_plain_map():
+    rng = random.Random(5)
+    records = [random_record(rng) for _ in range(100)]
+    with ThreadPoolExecutor(2) as executor:
+        assert stateCodec.map_batch(executor, stateCodec.encode, records, chunk_size=16) == \
+            [stateCodec.encode(record) for record in records]
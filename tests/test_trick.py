@@ -0,0 +1,110 @@
+import random
+from collections import namedtuple
+
+import pytest
+
+from game.skat.trick import Trick, TrickPool
+
+Move = namedtuple('Move', ['card', 'player'])
+
+
+class MockCard:
+    # beats() compares a power that is only defined for the led suit and trumps, like Card.beats.
+    def __init__(self, suit, rank, value=0, trump=False):
+        self.suit = suit
+        self.rank = rank
+        self.value = value
+        self.trump = trump
+
+    def beats(self, other):
+        if self.trump != other.trump:
+            return self.trump
+        return self.suit == other.suit and self.rank > other.rank
+
+
+def reference_winner(forehand, moves):
+    # The loop determine_winner ran before the winner was tracked incrementally.
+    winner = forehand
+    players = [move.player for move in moves]
+    for i in range(1, len(moves)):
+        if moves[i].card.beats(moves[players.index(winner)].card):
+            winner = moves[i].player
+    return winner
+
+
+def random_trick(rng):
+    players = ['forehand', 'middlehand', 'rearhand']
+    cards = [MockCard(rng.randrange(3), rng.randrange(8), rng.randrange(12), rng.random() < 0.3)
+             for _ in range(3)]
+    return [Move(card, player) for card, player in zip(cards, players)]
+
+
+def test_incremental_winner_matches_the_old_determine_winner():
+    rng = random.Random(0)
+    for _ in range(500):
+        moves = random_trick(rng)
+        trick = Trick('forehand')
+        for move in moves:
+            trick.add_move(move)
+        assert trick.trick_winner == reference_winner('forehand', moves)
+        trick.determine_winner()
+        assert trick.trick_winner == reference_winner('forehand', moves)
+        assert trick.card_values == sum(move.card.value for move in moves)
+
+
+def test_current_winner_is_kept_up_to_date_while_the_trick_is_open():
+    rng = random.Random(1)
+    for _ in range(200):
+        moves = random_trick(rng)
+        trick = Trick('forehand')
+        for played in range(1, 4):
+            trick.add_move(moves[played - 1])
+            assert trick.current_winner == reference_winner('forehand', moves[:played])
+
+
+def test_move_at_and_cards_without_sharing_state():
+    moves = random_trick(random.Random(2))
+    trick = Trick('forehand')
+    trick.add_move(moves[0])
+    trick.add_move(moves[1])
+    assert trick.count == 2
+    assert [trick.move_at(i) for i in range(trick.count)] == moves[:2]
+    with pytest.raises(IndexError):
+        trick.move_at(2)
+    trick.cards.append(moves[2])
+    assert trick.count == 2 and trick.cards == moves[:2]
+    trick.add_move(moves[2])
+    with pytest.raises(ValueError):
+        trick.add_move(moves[0])
+
+
+def test_pool_reuses_released_tricks_in_a_clean_state():
+    rng = random.Random(3)
+    pool = TrickPool(1)
+    trick = pool.acquire('forehand')
+    assert len(pool) == 0
+    first = random_trick(rng)
+    for move in first:
+        trick.add_move(move)
+    pool.release(trick)
+
+    reused = pool.acquire('middlehand')
+    assert reused is trick
+    assert reused.trick_forehand == 'middlehand'
+    assert reused.count == 0 and reused.cards == [] and reused.card_values == 0
+    assert reused.trick_winner is None and reused.current_winner is None
+
+    second = [Move(move.card, player) for move, player in
+              zip(random_trick(rng), ['middlehand', 'rearhand', 'forehand'])]
+    for move in second:
+        reused.add_move(move)
+    assert reused.trick_winner == reference_winner('middlehand', second)
+
+    # An empty pool still hands out tricks, and copies drawn from it are independent.
+    extra = pool.acquire('rearhand')
+    assert extra is not trick
+    pool.release(extra)
+    copied = reused.copy(pool)
+    assert copied is extra and copied == reused
+    copied.reset_trick()
+    assert reused.count == 3 and reused.trick_winner == reference_winner('middlehand', second)